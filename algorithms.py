@@ -1,4 +1,14 @@
+import copy
+import math
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from position_cache import namespace_salt
+from problems import FULL_MASK, REVERSI_PASS, reversi_flip_mask, reversi_move_mask
+from rollouts import random_playouts
 
 # --------------------------
 # Evaluation Functions
@@ -34,6 +44,62 @@ def refined_reversi_eval(state, player):
     return value if player == 1 else -value
 
 
+# --------------------------
+# Search Statistics
+# --------------------------
+
+class SearchStats:
+    """Work done by one select_move call; agents keep the latest as `stats`.
+
+    Minimax fills nodes, leaves, cutoffs, depth, depth_times and, with a
+    transposition table, tt_probes, tt_hits and tt_collisions; MCTS fills
+    rollouts, rollout_plies and visits (root move -> visit count).
+    """
+
+    def __init__(self):
+        self.time = 0.0
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.depth = 0
+        self.depth_times = []  # seconds spent on each completed depth
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_collisions = 0
+        self.rollouts = 0
+        self.rollout_plies = 0
+        self.visits = {}
+
+    @property
+    def effective_branching_factor(self):
+        """b such that b ** depth equals the nodes searched."""
+        if self.depth == 0 or self.nodes == 0:
+            return None
+        return self.nodes ** (1.0 / self.depth)
+
+    @property
+    def average_rollout_length(self):
+        if self.rollouts == 0:
+            return None
+        return self.rollout_plies / self.rollouts
+
+    def summary(self):
+        """Counters that add up across moves, for per-agent totals."""
+        return {
+            "moves": 1,
+            "time": self.time,
+            "nodes": self.nodes,
+            "leaves": self.leaves,
+            "cutoffs": self.cutoffs,
+            "depth": self.depth,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_collisions": self.tt_collisions,
+            "rollouts": self.rollouts,
+            "rollout_plies": self.rollout_plies,
+        }
+
+
 # --------------------------
 # Random Agent
 # --------------------------
@@ -45,99 +111,979 @@ class RandomAgent:
             return None
         return random.choice(moves)
 
+# --------------------------
+# Oracle Agent (solved games)
+# --------------------------
+
+class OracleAgent:
+    def __init__(self, table):
+        """
+        table: solved-game table with best_moves(state) -> list of moves,
+               e.g. problems.tictactoe_table()
+        """
+        self.table = table
+
+    def select_move(self, state):
+        moves = self.table.best_moves(state)
+        if not moves:
+            return None
+        return random.choice(moves)
+
+# --------------------------
+# Transposition Table
+# --------------------------
+
+# Bound types: the stored score is exact, a lower bound (the search failed
+# high) or an upper bound (it failed low)
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    def __init__(self, max_entries=2 ** 20):
+        """
+        max_entries: int - cap on stored positions. Entries live in two-slot
+        buckets: one slot keeps the deepest search seen for the bucket, the
+        other always takes the latest store.
+        """
+        self.num_buckets = max(1, max_entries // 2)
+        self.deep = [None] * self.num_buckets
+        self.recent = [None] * self.num_buckets
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0  # probes that found the bucket holding other positions
+        self.stores = 0
+
+    def probe(self, key):
+        """Return (key, depth, score, bound, best_move) for key, or None."""
+        self.probes += 1
+        index = key % self.num_buckets
+        deep = self.deep[index]
+        if deep is not None and deep[0] == key:
+            self.hits += 1
+            return deep
+        recent = self.recent[index]
+        if recent is not None and recent[0] == key:
+            self.hits += 1
+            return recent
+        if deep is not None or recent is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        self.stores += 1
+        index = key % self.num_buckets
+        entry = (key, depth, score, bound, best_move)
+        deep = self.deep[index]
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            self.deep[index] = entry
+        else:
+            self.recent[index] = entry
+
+    def clear(self):
+        self.deep = [None] * self.num_buckets
+        self.recent = [None] * self.num_buckets
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def __len__(self):
+        return sum(e is not None for e in self.deep) + sum(e is not None for e in self.recent)
+
+
+class CachedMoveIndex:
+    """Best move of a position cache entry, as an index into get_legal_moves()
+    that is only decoded if the entry's move is actually tried."""
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
 # --------------------------
 # Minimax Agent with Alpha-Beta Pruning
 # --------------------------
 
+# Scores are relative to the player at the root, so the same position
+# searched for the other side must not share an entry. Negamax scores are
+# stored from the side to move and get their own salt as well.
+TT_ROOT_SALT = {1: 0, -1: 0x9E3779B97F4A7C15}
+TT_NEGAMAX_SALT = 0xC2B2AE3D27D4EB4F
+
+# "alphabeta": mirrored max_value/min_value with a full window per root move.
+# "pvs": negamax with principal variation search and aspiration windows.
+SEARCH_MODES = ("alphabeta", "pvs")
+
+# Width of the null window used by PVS scout searches. Heuristic scores are
+# floats, so a window of "one point" is not available.
+PVS_EPSILON = 1e-6
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move time budget runs out."""
+
+
+# Move-ordering strategies MinimaxAgent can combine. Moves are sorted by
+# static priority first (state.move_priority or priority_fn), then by
+# killer moves at the same ply, then by the history table. Sorting by
+# state.move_priority lets the search take the moves a stage at a time from
+# state.iter_move_stages, whose stages already come in priority order.
+ORDERING_STRATEGIES = ("static", "killers", "history")
+
+
 class MinimaxAgent:
-    def __init__(self, max_depth, eval_fn=None, use_move_ordering=False):
+    def __init__(self, max_depth, eval_fn=None, use_move_ordering=False, tt_entries=0,
+                 time_limit_ms=None, ordering=ORDERING_STRATEGIES, priority_fn=None,
+                 search="alphabeta", aspiration_window=8.0, batch_eval=False,
+                 endgame_empties=0, position_cache=None):
         """
         max_depth: int - maximum search depth
         eval_fn: function(state, player) -> float
-        use_move_ordering: bool - whether to sort moves by heuristic value
+        use_move_ordering: bool - whether to sort moves before searching them
+        tt_entries: int - transposition table size (0 disables it); needs
+                    states with a `zobrist` hash
+        time_limit_ms: float - if set, deepen 1, 2, 3... up to max_depth until
+                       the budget runs out and play the deepest completed result
+        ordering: strategies from ORDERING_STRATEGIES used by move ordering
+        priority_fn: function(state, move) -> number - static priority used
+                     instead of state.move_priority
+        search: one of SEARCH_MODES. "pvs" always deepens iteratively and
+                centres an aspiration window of +/- aspiration_window on the
+                previous iteration's score
+        batch_eval: bool - if eval_fn has an eval_batch(boards, player, to_move)
+                    attribute, score all children of a node one ply above the
+                    horizon with a single call on their stacked boards. This
+                    pays off where leaf move generation is slow (ReversiState);
+                    bitboard states evaluate faster one leaf at a time
+        endgame_empties: int - on Reversi states (those with sides()), solve
+                         positions with at most this many empty squares
+                         exactly with ReversiEndgameSolver instead of
+                         searching to max_depth (0 disables it). The solve
+                         ignores time_limit_ms
+        position_cache: PositionCache - persistent layer under the
+                        transposition table (needs tt_entries > 0). Probes
+                        that miss the table fall back to it, and searches of
+                        at least position_cache.min_depth plies are queued
+                        for its next merge()
         """
+        if search not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {search}")
         self.max_depth = max_depth
         self.eval_fn = eval_fn
+        self.eval_batch = getattr(eval_fn, "eval_batch", None) if batch_eval else None
         self.use_move_ordering = use_move_ordering
+        self.ordering = tuple(ordering)
+        self.priority_fn = priority_fn
+        self.staged = use_move_ordering and "static" in self.ordering and priority_fn is None
+        self.killers = []
+        self.history = {}  # (player, move) -> cutoff credit, kept across moves
+        self.nodes = 0
+        self.tt = TranspositionTable(tt_entries) if tt_entries > 0 else None
+        self.time_limit_ms = time_limit_ms
+        self.search = search
+        self.aspiration_window = aspiration_window
+        self.aspiration_researches = 0
+        self.root_player = None
+        self.tt_salt = 0
+        self.search_depth = max_depth  # horizon of the current iteration
+        self.completed_depth = 0
+        self.root_best_move = None
+        self.deadline = None
+        self.hit_horizon = False
+        self.pv_table = []
+        self.prev_pv = []
+        self.follow_pv = False
+        self.endgame_empties = endgame_empties
+        self.endgame = ReversiEndgameSolver() if endgame_empties > 0 else None
+        self.position_cache = position_cache
+        self.cache_salt = 0
+        self.stats = SearchStats()
 
     def select_move(self, state):
-        best_score = -float('inf')
-        best_move = None
+        self.stats = SearchStats()
+        start = time.perf_counter()
+        # The table outlives the move, so its counters are read as differences
+        tt_before = (self.tt.probes, self.tt.hits, self.tt.collisions) if self.tt is not None else None
+        move = self.choose_move(state)
+        self.stats.time = time.perf_counter() - start
+        self.stats.nodes = self.nodes
+        self.stats.depth = self.completed_depth
+        if tt_before is not None:
+            self.stats.tt_probes = self.tt.probes - tt_before[0]
+            self.stats.tt_hits = self.tt.hits - tt_before[1]
+            self.stats.tt_collisions = self.tt.collisions - tt_before[2]
+        return move
+
+    def fork(self):
+        """An agent with the same settings for another game. It shares this
+        agent's transposition table and endgame solver, whose entries hold in
+        any game, and keeps its own history table and search state. Only one
+        of them may search at a time."""
+        agent = copy.copy(self)
+        agent.history = {}
+        agent.stats = SearchStats()
+        return agent
+
+    def choose_move(self, state):
         moves = state.get_legal_moves()
         if not moves:
             return None
+        if self.endgame is not None and hasattr(state, "sides"):
+            own, opp = state.sides()
+            empties = 64 - (own | opp).bit_count()
+            if empties <= self.endgame_empties:
+                start = time.perf_counter()
+                best_move, _ = self.endgame.best_move(own, opp)
+                self.nodes = self.endgame.nodes
+                self.completed_depth = empties
+                self.stats.depth_times.append(time.perf_counter() - start)
+                return best_move
+        # The search plays moves in place with make_move/unmake_move, on a
+        # copy so the caller's state is untouched even when a timeout
+        # abandons it partway down a line
+        state = state.copy()
+        # max_value/min_value score every node for the player choosing here
+        self.root_player = state.player
+        self.tt_salt = TT_ROOT_SALT[state.player]
+        if self.search == "pvs":
+            self.tt_salt ^= TT_NEGAMAX_SALT
+        if self.position_cache is not None:
+            # Scores only carry over between searches of the same game with
+            # the same heuristic
+            eval_name = getattr(self.eval_fn, "__name__", "utility")
+            self.cache_salt = namespace_salt(f"{type(state).__name__}/{eval_name}")
+        self.prev_pv = []
+        self.killers = [[None, None] for _ in range(self.max_depth + 1)]
+        self.nodes = 0
+        self.aspiration_researches = 0
+
+        if self.time_limit_ms is None and self.search == "alphabeta":
+            self.search_depth = self.max_depth
+            start = time.perf_counter()
+            best_move, _ = self.search_root(state, moves)
+            self.completed_depth = self.max_depth
+            self.stats.depth_times.append(time.perf_counter() - start)
+            return best_move
+        return self.iterative_deepening(state, moves)
+
+    def iterative_deepening(self, state, moves):
+        if self.time_limit_ms is not None:
+            self.deadline = time.perf_counter() + self.time_limit_ms / 1000.0
+        self.completed_depth = 0
+        best_move = None
+        score = None
+        try:
+            for depth in range(1, self.max_depth + 1):
+                self.search_depth = depth
+                self.hit_horizon = False
+                start = time.perf_counter()
+                if self.search == "pvs":
+                    best_move, score = self.aspiration_search(state, moves, score)
+                else:
+                    best_move, _ = self.search_root(state, moves)
+                self.completed_depth = depth
+                self.stats.depth_times.append(time.perf_counter() - start)
+                # Order the next iteration along this one's principal variation
+                self.prev_pv = self.pv_table[0]
+                if not self.hit_horizon:
+                    break  # every line reached a terminal state; deeper changes nothing
+        except SearchTimeout:
+            if best_move is None:
+                best_move = self.root_best_move or moves[0]
+        finally:
+            self.deadline = None
+        return best_move
 
+    def root_moves(self, state, moves):
+        self.root_best_move = None
+        self.pv_table = [[] for _ in range(self.search_depth + 1)]
+        self.follow_pv = bool(self.prev_pv)
+        moves = list(moves)
         if self.use_move_ordering:
-            random.shuffle(moves)
+            moves = self.sort_moves(state, moves, 0)
+        if self.prev_pv and self.prev_pv[0] in moves:
+            moves.remove(self.prev_pv[0])
+            moves.insert(0, self.prev_pv[0])
+        return moves
 
-        for move in moves:
-            child = state.apply_move(move)
-            score = self.min_value(child, -float('inf'), float('inf'), 1)
+    def search_root(self, state, moves):
+        best_score = -float('inf')
+        for move in self.root_moves(state, moves):
+            state.make_move(move)
+            score = self.min_value(state, -float('inf'), float('inf'), 1)
+            state.unmake_move()
             if score > best_score:
                 best_score = score
-                best_move = move
-        return best_move
+                self.root_best_move = move
+                self.pv_table[0] = [move] + self.pv_table[1]
+            self.follow_pv = False
+        return self.root_best_move, best_score
 
     def max_value(self, state, alpha, beta, depth):
-        if state.is_terminal() or depth >= self.max_depth:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        self.nodes += 1
+        self.pv_table[depth] = []
+        if state.is_terminal():
+            return self.evaluate(state)
+        if depth >= self.search_depth:
+            self.hit_horizon = True
             return self.evaluate(state)
+        remaining = self.search_depth - depth
+        hash_move = None
+        if self.tt is not None:
+            key = state.zobrist ^ self.tt_salt
+            entry = self.probe_tt(key)
+            if entry is not None:
+                if entry[1] >= remaining:
+                    score, bound = entry[2], entry[3]
+                    if bound == EXACT or (bound == LOWER and score >= beta) or \
+                            (bound == UPPER and score <= alpha):
+                        self.hit_horizon = True
+                        return score
+                hash_move = self.entry_move(state, entry)
+        alpha_orig = alpha
         v = -float('inf')
-        moves = state.get_legal_moves()
-        if self.use_move_ordering:
-            random.shuffle(moves)
-        for move in moves:
-            child = state.apply_move(move)
-            v = max(v, self.min_value(child, alpha, beta, depth + 1))
+        best_move = None
+        moves = self.ordered_moves(state, hash_move, depth)
+        frontier = None
+        if remaining == 1 and self.eval_batch is not None:
+            moves = list(moves)  # every child is scored anyway
+            frontier = self.evaluate_frontier(state, moves, depth)
+        for index, move in enumerate(moves):
+            if frontier is not None:
+                score = frontier[index]
+            else:
+                state.make_move(move)
+                score = self.min_value(state, alpha, beta, depth + 1)
+                state.unmake_move()
+            if score > v:
+                v = score
+                best_move = move
+                self.pv_table[depth] = [move] + self.pv_table[depth + 1]
             if v >= beta:
-                return v
+                self.record_cutoff(state, move, depth, remaining)
+                break
             alpha = max(alpha, v)
+        if self.tt is not None:
+            bound = LOWER if v >= beta else (UPPER if v <= alpha_orig else EXACT)
+            self.store_tt(state, key, remaining, v, bound, best_move)
         return v
 
     def min_value(self, state, alpha, beta, depth):
-        if state.is_terminal() or depth >= self.max_depth:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        self.nodes += 1
+        self.pv_table[depth] = []
+        if state.is_terminal():
+            return self.evaluate(state)
+        if depth >= self.search_depth:
+            self.hit_horizon = True
             return self.evaluate(state)
+        remaining = self.search_depth - depth
+        hash_move = None
+        if self.tt is not None:
+            key = state.zobrist ^ self.tt_salt
+            entry = self.probe_tt(key)
+            if entry is not None:
+                if entry[1] >= remaining:
+                    score, bound = entry[2], entry[3]
+                    if bound == EXACT or (bound == LOWER and score >= beta) or \
+                            (bound == UPPER and score <= alpha):
+                        self.hit_horizon = True
+                        return score
+                hash_move = self.entry_move(state, entry)
+        beta_orig = beta
         v = float('inf')
-        moves = state.get_legal_moves()
-        if self.use_move_ordering:
-            random.shuffle(moves)
-        for move in moves:
-            child = state.apply_move(move)
-            v = min(v, self.max_value(child, alpha, beta, depth + 1))
+        best_move = None
+        moves = self.ordered_moves(state, hash_move, depth)
+        frontier = None
+        if remaining == 1 and self.eval_batch is not None:
+            moves = list(moves)  # every child is scored anyway
+            frontier = self.evaluate_frontier(state, moves, depth)
+        for index, move in enumerate(moves):
+            if frontier is not None:
+                score = frontier[index]
+            else:
+                state.make_move(move)
+                score = self.max_value(state, alpha, beta, depth + 1)
+                state.unmake_move()
+            if score < v:
+                v = score
+                best_move = move
+                self.pv_table[depth] = [move] + self.pv_table[depth + 1]
             if v <= alpha:
-                return v
+                self.record_cutoff(state, move, depth, remaining)
+                break
             beta = min(beta, v)
+        if self.tt is not None:
+            bound = UPPER if v <= alpha else (LOWER if v >= beta_orig else EXACT)
+            self.store_tt(state, key, remaining, v, bound, best_move)
         return v
 
+    def aspiration_search(self, state, moves, previous_score):
+        """Search the root with PVS in a window around the previous score.
+
+        A result on or outside the window is only a bound, so that side of
+        the window is opened and the root searched again.
+        """
+        alpha, beta = -float('inf'), float('inf')
+        if previous_score is not None and self.aspiration_window:
+            alpha = previous_score - self.aspiration_window
+            beta = previous_score + self.aspiration_window
+        while True:
+            best_move, score = self.search_root_pvs(state, moves, alpha, beta)
+            if score <= alpha and alpha != -float('inf'):
+                alpha = -float('inf')
+            elif score >= beta and beta != float('inf'):
+                beta = float('inf')
+            else:
+                return best_move, score
+            self.aspiration_researches += 1
+
+    def search_root_pvs(self, state, moves, alpha, beta):
+        best_score = -float('inf')
+        for index, move in enumerate(self.root_moves(state, moves)):
+            state.make_move(move)
+            if index == 0:
+                score = -self.negamax(state, -beta, -alpha, 1)
+            else:
+                score = -self.negamax(state, -alpha - PVS_EPSILON, -alpha, 1)
+                if alpha < score < beta:
+                    score = -self.negamax(state, -beta, -alpha, 1)
+            state.unmake_move()
+            if score > best_score:
+                best_score = score
+                self.root_best_move = move
+                self.pv_table[0] = [move] + self.pv_table[1]
+            self.follow_pv = False
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return self.root_best_move, best_score
+
+    def negamax(self, state, alpha, beta, depth):
+        """Principal variation search; scores are for the player to move."""
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        self.nodes += 1
+        self.pv_table[depth] = []
+        if state.is_terminal():
+            return self.evaluate_negamax(state)
+        if depth >= self.search_depth:
+            self.hit_horizon = True
+            return self.evaluate_negamax(state)
+        remaining = self.search_depth - depth
+        hash_move = None
+        if self.tt is not None:
+            key = state.zobrist ^ self.tt_salt
+            entry = self.probe_tt(key)
+            if entry is not None:
+                if entry[1] >= remaining:
+                    score, bound = entry[2], entry[3]
+                    if bound == EXACT or (bound == LOWER and score >= beta) or \
+                            (bound == UPPER and score <= alpha):
+                        self.hit_horizon = True
+                        return score
+                hash_move = self.entry_move(state, entry)
+        alpha_orig = alpha
+        v = -float('inf')
+        best_move = None
+        moves = self.ordered_moves(state, hash_move, depth)
+        frontier = None
+        if remaining == 1 and self.eval_batch is not None:
+            moves = list(moves)  # every child is scored anyway
+            frontier = self.evaluate_frontier(state, moves, depth)
+        for index, move in enumerate(moves):
+            if frontier is not None:
+                # Exact leaf scores need no scout; turn them to this side's view
+                score = frontier[index] if state.player == self.root_player else -frontier[index]
+            else:
+                state.make_move(move)
+                if index == 0:
+                    score = -self.negamax(state, -beta, -alpha, depth + 1)
+                else:
+                    # Scout with a null window; only a move that beats alpha is
+                    # searched again with the full window
+                    score = -self.negamax(state, -alpha - PVS_EPSILON, -alpha, depth + 1)
+                    if alpha < score < beta:
+                        score = -self.negamax(state, -beta, -alpha, depth + 1)
+                state.unmake_move()
+            if score > v:
+                v = score
+                best_move = move
+                self.pv_table[depth] = [move] + self.pv_table[depth + 1]
+            if v >= beta:
+                self.record_cutoff(state, move, depth, remaining)
+                break
+            alpha = max(alpha, v)
+        if self.tt is not None:
+            bound = LOWER if v >= beta else (UPPER if v <= alpha_orig else EXACT)
+            self.store_tt(state, key, remaining, v, bound, best_move)
+        return v
+
+    def probe_tt(self, key):
+        """Transposition table entry for key, falling back to the position cache."""
+        entry = self.tt.probe(key)
+        if entry is None and self.position_cache is not None:
+            cached = self.position_cache.probe(key ^ self.cache_salt)
+            if cached is not None:
+                depth, score, bound, move_index = cached
+                entry = (key, depth, score, bound, CachedMoveIndex(move_index))
+                self.tt.store(*entry)
+        return entry
+
+    def entry_move(self, state, entry):
+        """Best move of a table entry. Moves promoted from the position cache
+        are decoded here, so a probe never generates the node's moves."""
+        move = entry[4]
+        if isinstance(move, CachedMoveIndex):
+            moves = state.get_legal_moves()
+            move = moves[move.index] if 0 <= move.index < len(moves) else None
+            self.tt.store(entry[0], entry[1], entry[2], entry[3], move)
+        return move
+
+    def store_tt(self, state, key, remaining, score, bound, best_move):
+        self.tt.store(key, remaining, score, bound, best_move)
+        if self.position_cache is not None and remaining >= self.position_cache.min_depth:
+            moves = state.get_legal_moves()
+            move_index = moves.index(best_move) if best_move in moves else -1
+            self.position_cache.record(key ^ self.cache_salt, remaining, score, bound, move_index)
+
+    def ordered_moves(self, state, hash_move, depth):
+        """Yield the moves of a node in search order.
+
+        The principal variation and hash moves come first, checked with
+        state.is_legal_move so nothing else is generated for them. The rest
+        follow sorted, a stage of state.iter_move_stages at a time when
+        ordering by static priority, so a cutoff skips the later stages.
+        """
+        first = []
+        # While still on the previous iteration's principal variation, its
+        # move at this ply goes first
+        if self.follow_pv:
+            self.follow_pv = False
+            if depth < len(self.prev_pv) and state.is_legal_move(self.prev_pv[depth]):
+                first.append(self.prev_pv[depth])
+                self.follow_pv = True
+        if hash_move is not None and hash_move not in first and state.is_legal_move(hash_move):
+            first.append(hash_move)
+        yield from first
+        stages = state.iter_move_stages() if self.staged else (state.get_legal_moves(),)
+        for stage in stages:
+            if self.use_move_ordering and len(stage) > 1:
+                stage = self.sort_moves(state, stage, depth)
+            for move in stage:
+                if move not in first:
+                    yield move
+
+    def sort_moves(self, state, moves, depth):
+        priority = None
+        if "static" in self.ordering:
+            if self.priority_fn is not None:
+                priority = lambda move: self.priority_fn(state, move)
+            else:
+                priority = getattr(state, "move_priority", None)
+        killers = (None, None)
+        if "killers" in self.ordering and depth < len(self.killers):
+            killers = self.killers[depth]
+        history = self.history if "history" in self.ordering else {}
+        player = state.player
+
+        def key(move):
+            if move == killers[0]:
+                killer_rank = 2
+            elif move == killers[1]:
+                killer_rank = 1
+            else:
+                killer_rank = 0
+            return (priority(move) if priority else 0,
+                    killer_rank,
+                    history.get((player, move), 0))
+
+        # sorted is stable, so ties keep generation order
+        return sorted(moves, key=key, reverse=True)
+
+    def record_cutoff(self, state, move, depth, remaining):
+        """Credit a move that caused a cutoff as a killer and in the history table."""
+        self.stats.cutoffs += 1
+        if not self.use_move_ordering:
+            return
+        if "killers" in self.ordering and depth < len(self.killers):
+            killers = self.killers[depth]
+            if move != killers[0]:
+                killers[1] = killers[0]
+                killers[0] = move
+        if "history" in self.ordering:
+            key = (state.player, move)
+            self.history[key] = self.history.get(key, 0) + remaining * remaining
+
+    def evaluate_frontier(self, state, moves, depth):
+        """Score all children of a node one ply above the horizon with eval_batch.
+
+        Returns root-player scores in move order, or None to search the
+        children one by one. Children are not tested for terminal states,
+        since evaluate scores those with eval_fn all the same; hit_horizon
+        is set regardless, which at worst costs iterative deepening one
+        extra iteration.
+        """
+        if self.eval_batch is None or not moves:
+            return None
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        boards = []
+        for move in moves:
+            state.make_move(move)
+            boards.append(np.array(state.board))
+            state.unmake_move()
+        self.nodes += len(moves)
+        self.stats.leaves += len(moves)
+        self.hit_horizon = True
+        self.pv_table[depth + 1] = []
+        scores = self.eval_batch(np.stack(boards), self.root_player, -state.player)
+        return np.asarray(scores, dtype=float).tolist()
+
     def evaluate(self, state):
+        self.stats.leaves += 1
         if self.eval_fn:
-            return self.eval_fn(state, state.player)
+            return self.eval_fn(state, self.root_player)
         else:
             return state.utility()
 
+    def evaluate_negamax(self, state):
+        # The same root-player evaluation as alphabeta, seen from the side to
+        # move, so both search modes agree on every score
+        score = self.evaluate(state)
+        return score if state.player == self.root_player else -score
+
+
+# --------------------------
+# Reversi Endgame Solver
+# --------------------------
+
+# The four 4x4 quadrants of the board, for parity ordering
+REVERSI_QUADRANTS = tuple(
+    sum(1 << (i * 8 + j) for i in rows for j in cols)
+    for rows in (range(0, 4), range(4, 8)) for cols in (range(0, 4), range(4, 8))
+)
+
+# Bounds on a final disc differential
+ENDGAME_LOSS, ENDGAME_WIN = -65, 65
+
+
+class ReversiEndgameSolver:
+    """Exact alpha-beta search of Reversi endgames on (own, opp) bitboards.
+
+    Scores are final disc differentials (discs of the side to move minus
+    the opponent's, empty squares counting for neither side), so the search
+    plays for the largest margin, not only the win. A side with no move
+    passes; the game ends when neither side can move.
+    """
+
+    def __init__(self, tt_entries=2 ** 16, tt_min_empties=6, fastest_first_empties=7):
+        """
+        tt_entries: int - size of the solver's own transposition table (0
+                    disables it). Exact scores never go stale, so it is kept
+                    across moves
+        tt_min_empties: int - only positions with at least this many empty
+                        squares are stored; shallower ones are cheaper to search
+        fastest_first_empties: int - with at least this many empty squares,
+                               try moves that leave the opponent the fewest
+                               replies first; below it, order by parity alone
+        """
+        self.tt = TranspositionTable(tt_entries) if tt_entries > 0 else None
+        self.tt_min_empties = tt_min_empties
+        self.fastest_first_empties = fastest_first_empties
+        self.nodes = 0
+
+    def best_move(self, own, opp):
+        """Return (move, score): the best move for the side to move and its exact score.
+
+        The move is an (i, j) square, REVERSI_PASS, or None if the game is over.
+        """
+        self.nodes = 1
+        moves = reversi_move_mask(own, opp)
+        if not moves:
+            if reversi_move_mask(opp, own):
+                return REVERSI_PASS, -self.solve(opp, own, ENDGAME_LOSS, ENDGAME_WIN)
+            return None, own.bit_count() - opp.bit_count()
+        empties = 64 - (own | opp).bit_count()
+        alpha = ENDGAME_LOSS
+        best_bit = None
+        for bit, flips in self.ordered_moves(own, opp, moves, empties, None):
+            score = -self.solve(opp ^ flips, own | bit | flips, -ENDGAME_WIN, -alpha)
+            if score > alpha or best_bit is None:
+                alpha = max(alpha, score)
+                best_bit = bit
+        return divmod(best_bit.bit_length() - 1, 8), alpha
+
+    def solve(self, own, opp, alpha, beta):
+        """Exact score of the position for the side to move when it lies
+        within (alpha, beta); otherwise a bound on the far side of the window."""
+        self.nodes += 1
+        moves = reversi_move_mask(own, opp)
+        if not moves:
+            if not reversi_move_mask(opp, own):
+                return own.bit_count() - opp.bit_count()
+            return -self.solve(opp, own, -beta, -alpha)
+
+        empties = 64 - (own | opp).bit_count()
+        key = None
+        hash_bit = None
+        original_alpha = alpha
+        if self.tt is not None and empties >= self.tt_min_empties:
+            key = hash((own, opp))
+            entry = self.tt.probe(key)
+            if entry is not None:
+                _, _, score, bound, hash_bit = entry
+                if bound == EXACT:
+                    return score
+                if bound == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        best = ENDGAME_LOSS
+        best_bit = None
+        for bit, flips in self.ordered_moves(own, opp, moves, empties, hash_bit):
+            score = -self.solve(opp ^ flips, own | bit | flips, -beta, -alpha)
+            if score > best:
+                best = score
+                best_bit = bit
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if key is not None:
+            if best <= original_alpha:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            self.tt.store(key, empties, best, bound, best_bit)
+        return best
+
+    def ordered_moves(self, own, opp, moves, empties, hash_bit):
+        """(move bit, flips) pairs: the hash move, then fastest-first, then parity.
+
+        Parity puts moves in quadrants with an odd number of empty squares
+        first, so the side to move tends to get the last disc in each region.
+        """
+        empty = ~(own | opp) & FULL_MASK
+        odd = 0
+        for quadrant in REVERSI_QUADRANTS:
+            if (empty & quadrant).bit_count() & 1:
+                odd |= quadrant
+        fastest_first = empties >= self.fastest_first_empties
+        ordered = []
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            flips = reversi_flip_mask(own, opp, bit)
+            replies = 0
+            if fastest_first:
+                replies = reversi_move_mask(opp ^ flips, own | bit | flips).bit_count()
+            ordered.append((bit != hash_bit, replies, not bit & odd, bit, flips))
+        ordered.sort()
+        return [(bit, flips) for _, _, _, bit, flips in ordered]
+
 
 # --------------------------
 # MCTS Agent (Monte Carlo Tree Search)
 # --------------------------
 
+class MCTSNode:
+    """A tree node. It keeps its position packed (see problems.py) rather
+    than a whole state, so large trees stay small. `state` rebuilds the
+    state when the node is first expanded, and the node holds on to it
+    until every child exists, so a node is rebuilt once, not once per child."""
+
+    __slots__ = ("position", "state_class", "player", "parent", "move", "children",
+                 "untried", "visits", "wins", "expanding")
+
+    def __init__(self, state, parent=None, move=None):
+        self.position = state.pack()
+        self.state_class = type(state)
+        self.player = state.player
+        self.parent = parent
+        self.move = move          # move that led here from parent
+        self.children = {}        # move -> MCTSNode
+        self.untried = None       # legal moves not expanded yet, filled on first visit
+        self.visits = 0
+        self.wins = 0.0           # credit for the player who played `move`
+        self.expanding = None     # state kept while children are still being added
+
+    @property
+    def state(self):
+        """A state for this node's position; do not modify it."""
+        if self.expanding is not None:
+            return self.expanding
+        return self.state_class.from_packed(self.position)
+
+    def uct_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(
+            self.children.values(),
+            key=lambda c: c.wins / c.visits + exploration * math.sqrt(log_visits / c.visits)
+        )
+
+
 class MCTSAgent:
-    def __init__(self, num_simulations=50):
+    def __init__(self, num_simulations=50, exploration=1.41, use_tree=True, reuse_tree=True,
+                 batch_size=None, playout_fn=None):
+        """
+        num_simulations: int - playouts per legal root move; the tree search
+                         spends the same total, num_simulations * len(moves)
+        exploration: float - UCT exploration constant
+        use_tree: bool - UCT tree search; False plays flat Monte Carlo, with
+                  num_simulations playouts for every root move
+        reuse_tree: bool - keep the subtree under the opponent's reply for the
+                    next select_move
+        batch_size: int or None - play batch_size vectorized playouts (see
+                    rollouts.py) from each new leaf instead of one serial
+                    playout; the playout total stays the same, so the tree
+                    gets total // batch_size iterations. Flat Monte Carlo
+                    batches all num_simulations playouts of a root move.
+        playout_fn: function(state, count) -> (winners, plies) - plays the
+                    batched playouts instead of rollouts.random_playouts;
+                    the move server passes one that pools them across games
+        """
         self.num_simulations = num_simulations
+        self.exploration = exploration
+        self.use_tree = use_tree
+        self.reuse_tree = reuse_tree
+        self.batch_size = batch_size
+        self.playout_fn = playout_fn
+        self.root = None
+        self.rng = random  # source of expansion choices
+        self.stats = SearchStats()
 
     def select_move(self, state):
+        self.stats = SearchStats()
+        start = time.perf_counter()
+        move = self.choose_move(state)
+        self.stats.time = time.perf_counter() - start
+        return move
+
+    def fork(self):
+        """An agent with the same settings and an empty tree, for another game."""
+        agent = copy.copy(self)
+        agent.root = None
+        agent.stats = SearchStats()
+        return agent
+
+    def choose_move(self, state):
         legal_moves = state.get_legal_moves()
         if not legal_moves:
             return None
+        if not self.use_tree:
+            return self.select_move_flat(state, legal_moves)
+
+        root = self.find_root(state)
+        iterations = self.num_simulations * len(legal_moves)
+        if self.batch_size:
+            iterations = max(1, iterations // self.batch_size)
+        for _ in range(iterations):
+            self.run_iteration(root)
+
+        self.stats.visits = {move: child.visits for move, child in root.children.items()}
+        best = max(root.children.values(), key=lambda c: c.visits)
+        if self.reuse_tree:
+            best.parent = None
+            self.root = best
+        return best.move
 
+    def find_root(self, state):
+        """Reuse the stored subtree if `state` is a position we already expanded."""
+        old_root = self.root
+        self.root = None
+        if self.reuse_tree and old_root is not None:
+            position = state.pack()
+            candidates = [old_root] + list(old_root.children.values())
+            for node in candidates:
+                if node.state_class is type(state) and node.position == position:
+                    node.parent = None
+                    return node
+        return MCTSNode(state)
+
+    def run_iteration(self, root):
+        node, state = self.select_and_expand(root)
+        if self.batch_size:
+            results = self.batch_playouts(state, self.batch_size).tolist()
+        else:
+            results = [self.simulate(state)]
+        self.backpropagate(node, results)
+
+    def batch_playouts(self, state, count):
+        if self.playout_fn is not None:
+            winners, plies = self.playout_fn(state, count)
+        else:
+            winners, plies = random_playouts(state, count, with_lengths=True)
+        self.stats.rollouts += count
+        self.stats.rollout_plies += int(plies.sum())
+        return winners
+
+    def select_and_expand(self, root):
+        """Return the new leaf and its state, rebuilding at most one state on the way."""
+        # Selection: descend through fully expanded nodes by UCT
+        node = root
+        state = None
+        if node.untried is None:
+            state = node.state
+            node.untried = list(state.get_legal_moves())
+        while not node.untried and node.children:
+            node = node.uct_child(self.exploration)
+            state = None
+            if node.untried is None:
+                state = node.state
+                node.untried = list(state.get_legal_moves())
+        if state is None:
+            state = node.state
+
+        # Expansion: add one untried child
+        if node.untried:
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            # Keep the state for the node's remaining children, if any
+            node.expanding = state if node.untried else None
+            state = state.apply_move(move)
+            child = MCTSNode(state, node, move)
+            node.children[move] = child
+            node = child
+        return node, state
+
+    def backpropagate(self, node, results):
+        """Credit a batch of playout winners from `node` up to the root."""
+        counts = {}
+        for result in results:
+            counts[result] = counts.get(result, 0) + 1
+        while node is not None:
+            node.visits += len(results)
+            if node.parent is not None:
+                mover = node.parent.player
+                node.wins += counts.get(mover, 0) + 0.5 * (
+                    counts.get(0, 0) + counts.get(None, 0))
+            node = node.parent
+
+    def select_move_flat(self, state, legal_moves):
         move_wins = {move: 0 for move in legal_moves}
         move_plays = {move: 0 for move in legal_moves}
 
         for move in legal_moves:
+            if self.batch_size:
+                winners = self.batch_playouts(state.apply_move(move), self.num_simulations)
+                move_plays[move] += self.num_simulations
+                move_wins[move] += int((winners == state.player).sum())
+                continue
             for _ in range(self.num_simulations):
                 result = self.simulate(state.apply_move(move))
                 move_plays[move] += 1
                 if result == state.player:
                     move_wins[move] += 1
 
+        self.stats.visits = move_plays
         best_move = max(
             legal_moves,
             key=lambda m: move_wins[m] / move_plays[m]
@@ -145,11 +1091,149 @@ class MCTSAgent:
         return best_move
 
     def simulate(self, state):
-        current_state = state
+        # One copy per playout, then moves are played on it in place
+        current_state = state.copy()
+        plies = 0
         while not current_state.is_terminal():
             legal = current_state.get_legal_moves()
             if not legal:
                 break
             move = random.choice(legal)
-            current_state = current_state.apply_move(move)
+            current_state.make_move(move)
+            plies += 1
+        self.stats.rollouts += 1
+        self.stats.rollout_plies += plies
         return current_state.get_winner()
+
+
+# --------------------------
+# Parallel MCTS
+# --------------------------
+
+# Worker tasks live at module level so the process pool can pickle them.
+# Each reseeds the worker's global RNG from the seed it is handed, so every
+# task draws from its own reproducible stream whichever process runs it.
+
+def root_parallel_task(state, iterations, exploration, seed):
+    """Grow an independent UCT tree; return {move: (visits, wins)} at its root
+    and the total plies of its playouts."""
+    random.seed(seed)
+    agent = MCTSAgent(exploration=exploration, reuse_tree=False)
+    root = MCTSNode(state)
+    for _ in range(iterations):
+        agent.run_iteration(root)
+    children = {move: (child.visits, child.wins) for move, child in root.children.items()}
+    return children, agent.stats.rollout_plies
+
+
+def rollout_task(state, count, seed):
+    """Play `count` random games from `state`; return their winners and total plies."""
+    random.seed(seed)
+    agent = MCTSAgent()
+    winners = [agent.simulate(state) for _ in range(count)]
+    return winners, agent.stats.rollout_plies
+
+
+class ParallelMCTSAgent(MCTSAgent):
+    def __init__(self, num_simulations=50, workers=4, mode="root", leaf_batch=1,
+                 exploration=1.41, seed=None):
+        """
+        num_simulations: int - playouts per legal root move, as in MCTSAgent;
+                         each worker tree ("root") or each leaf's worker batch
+                         ("leaf") gets that budget, so a move takes about as
+                         long as the serial agent while playing `workers`
+                         times as many games
+        workers: int - size of the process pool, created on first use and
+                 kept for later moves; call close() when done
+        mode: "root" merges root statistics from independent per-worker trees;
+              "leaf" grows one tree here and sends each new leaf's playouts
+              to the pool, leaf_batch per worker
+        seed: int - base of the per-task RNG streams (random if None)
+        """
+        if mode not in ("root", "leaf"):
+            raise ValueError(f"Unknown parallel MCTS mode: {mode}")
+        super().__init__(num_simulations, exploration, use_tree=True, reuse_tree=(mode == "leaf"))
+        self.workers = workers
+        self.mode = mode
+        self.leaf_batch = leaf_batch
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.moves_played = 0
+        self.pool = None
+        self.owns_pool = True  # False on forks, which borrow their parent's pool
+
+    def fork(self):
+        """An agent with the same settings for another game. It draws its own
+        seed from this agent's RNG, so games get independent playouts, and
+        uses this agent's process pool; only this agent's close() shuts it down."""
+        agent = super().fork()
+        agent.seed = self.rng.getrandbits(32)
+        agent.rng = random.Random(agent.seed)
+        agent.moves_played = 0
+        agent.pool = self.get_pool()
+        agent.owns_pool = False
+        return agent
+
+    def task_seed(self, *indices):
+        # Seeding random.Random with a string is deterministic across processes
+        rng = random.Random("-".join(str(x) for x in (self.seed, self.moves_played) + indices))
+        return rng.getrandbits(64)
+
+    def get_pool(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def close(self):
+        if self.pool is not None and self.owns_pool:
+            self.pool.shutdown()
+            self.pool = None
+
+    def choose_move(self, state):
+        legal_moves = state.get_legal_moves()
+        if not legal_moves:
+            return None
+        iterations = self.num_simulations * len(legal_moves)
+        if self.mode == "root":
+            move = self.select_move_root(state, iterations)
+        else:
+            move = self.select_move_leaf(state, iterations)
+        self.moves_played += 1
+        return move
+
+    def select_move_root(self, state, iterations):
+        pool = self.get_pool()
+        futures = [pool.submit(root_parallel_task, state, iterations, self.exploration,
+                               self.task_seed(k))
+                   for k in range(self.workers)]
+        visits = {}
+        for future in futures:
+            children, plies = future.result()
+            for move, (n, _) in children.items():
+                visits[move] = visits.get(move, 0) + n
+            self.stats.rollouts += iterations
+            self.stats.rollout_plies += plies
+        self.stats.visits = visits
+        return max(visits, key=visits.get)
+
+    def select_move_leaf(self, state, iterations):
+        pool = self.get_pool()
+        root = self.find_root(state)
+        for i in range(iterations):
+            node, state = self.select_and_expand(root)
+            futures = [pool.submit(rollout_task, state, self.leaf_batch, self.task_seed(i, k))
+                       for k in range(self.workers)]
+            results = []
+            for future in futures:
+                winners, plies = future.result()
+                results.extend(winners)
+                self.stats.rollout_plies += plies
+            self.stats.rollouts += len(results)
+            self.backpropagate(node, results)
+
+        self.stats.visits = {move: child.visits for move, child in root.children.items()}
+        best = max(root.children.values(), key=lambda c: c.visits)
+        best.parent = None
+        self.root = best
+        return best.move
+
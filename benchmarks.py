@@ -0,0 +1,216 @@
+import argparse
+import json
+import random
+import sys
+import time
+from problems import (
+    TicTacToeState,
+    CheckersState,
+    BitboardCheckersState,
+    ReversiState,
+    BitboardReversiState,
+    tictactoe_refined_heuristic,
+    checkers_refined_heuristic,
+    reversi_refined_heuristic,
+)
+from algorithms import MinimaxAgent, MCTSAgent
+from rollouts import random_playouts
+
+# ---------------------------------------------
+# Benchmark setup
+# ---------------------------------------------
+
+# Every state implementation of a game, so perft can check them against
+# each other as well as against the reference counts below
+BENCH_GAMES = {
+    "tictactoe": [TicTacToeState],
+    "checkers": [CheckersState, BitboardCheckersState],
+    "reversi": [ReversiState, BitboardReversiState],
+}
+
+BENCH_HEURISTICS = {
+    "tictactoe": tictactoe_refined_heuristic,
+    "checkers": checkers_refined_heuristic,
+    "reversi": reversi_refined_heuristic,
+}
+
+# Leaf counts from the start position, depth 1 first. Tic Tac Toe stops at
+# won boards, and Reversi has no passes this shallow, so both match the
+# published sequences; Checkers follows this repo's rules (men only, no
+# forced captures) and was recorded from CheckersState.
+PERFT_EXPECTED = {
+    "tictactoe": [9, 72, 504, 3024, 15120, 54720, 148176, 200448, 127872],
+    "checkers": [7, 49, 379, 2872, 23582, 189143, 1585096],
+    "reversi": [4, 12, 56, 244, 1396, 8200, 55092],
+}
+
+PERFT_DEPTH = {"tictactoe": 9, "checkers": 5, "reversi": 5}
+MINIMAX_DEPTH = {"tictactoe": 9, "checkers": 5, "reversi": 4}
+PLAYOUTS = {"tictactoe": 2000, "checkers": 200, "reversi": 200}
+BATCH_PLAYOUTS = 2000
+
+# Throughput may drop by this fraction of the baseline before --compare fails
+DEFAULT_THRESHOLD = 0.2
+
+# ---------------------------------------------
+# Perft
+# ---------------------------------------------
+
+def perft(state, depth):
+    """Number of move sequences of exactly `depth` plies that end before the game does."""
+    if depth == 0:
+        return 1
+    if state.is_terminal():
+        return 0
+    total = 0
+    for move in list(state.get_legal_moves()):
+        state.make_move(move)
+        total += perft(state, depth - 1)
+        state.unmake_move()
+    return total
+
+
+def bench_perft(game, state_class, depth):
+    """Perft counts for depths 1..depth, each checked against PERFT_EXPECTED."""
+    counts = []
+    errors = []
+    expected = PERFT_EXPECTED[game]
+    start = time.perf_counter()
+    for d in range(1, depth + 1):
+        count = perft(state_class(), d)
+        counts.append(count)
+        if d <= len(expected) and count != expected[d - 1]:
+            errors.append(f"{game}/{state_class.__name__}: perft({d}) = {count}, "
+                          f"expected {expected[d - 1]}")
+    elapsed = time.perf_counter() - start
+    return {"counts": counts, "nodes": sum(counts), "time": elapsed,
+            "per_sec": sum(counts) / elapsed}, errors
+
+# ---------------------------------------------
+# Agent throughput
+# ---------------------------------------------
+
+def bench_minimax(game, state_class, depth):
+    """Nodes per second of a fixed-depth alpha-beta search from the start position."""
+    agent = MinimaxAgent(max_depth=depth, eval_fn=BENCH_HEURISTICS[game],
+                         use_move_ordering=True, tt_entries=2 ** 16)
+    start = time.perf_counter()
+    agent.select_move(state_class())
+    elapsed = time.perf_counter() - start
+    return {"nodes": agent.nodes, "time": elapsed, "per_sec": agent.nodes / elapsed}
+
+
+def bench_playouts(state_class, count):
+    """Serial random playouts per second with MCTSAgent.simulate."""
+    agent = MCTSAgent()
+    state = state_class()
+    start = time.perf_counter()
+    for _ in range(count):
+        agent.simulate(state)
+    elapsed = time.perf_counter() - start
+    return {"playouts": count, "time": elapsed, "per_sec": count / elapsed}
+
+
+def bench_batch_playouts(state_class, count):
+    """Vectorized random playouts per second with rollouts.random_playouts."""
+    state = state_class()
+    start = time.perf_counter()
+    random_playouts(state, count)
+    elapsed = time.perf_counter() - start
+    return {"playouts": count, "time": elapsed, "per_sec": count / elapsed}
+
+# ---------------------------------------------
+# Suite
+# ---------------------------------------------
+
+def best_of(repeat, bench, *args):
+    """Run a benchmark `repeat` times and keep the fastest run."""
+    return max((bench(*args) for _ in range(repeat)), key=lambda r: r["per_sec"])
+
+
+def run_benchmarks(games=None, repeat=3, seed=0):
+    """Run the whole suite; returns (results, perft errors)."""
+    results = {}
+    errors = []
+    for game in games or BENCH_GAMES:
+        for state_class in BENCH_GAMES[game]:
+            name = f"{game}/{state_class.__name__}"
+            random.seed(seed)
+            perft_result, perft_errors = bench_perft(game, state_class, PERFT_DEPTH[game])
+            results[f"perft/{name}"] = perft_result
+            errors.extend(perft_errors)
+            results[f"minimax/{name}"] = best_of(repeat, bench_minimax, game, state_class,
+                                                 MINIMAX_DEPTH[game])
+            random.seed(seed)
+            results[f"playouts/{name}"] = best_of(repeat, bench_playouts, state_class,
+                                                  PLAYOUTS[game])
+            results[f"batch_playouts/{name}"] = best_of(repeat, bench_batch_playouts,
+                                                        state_class, BATCH_PLAYOUTS)
+    return results, errors
+
+
+def compare(results, baseline, threshold):
+    """Names of benchmarks whose throughput fell more than `threshold` below baseline."""
+    regressions = []
+    for name, base in baseline.items():
+        if name not in results:
+            continue
+        floor = base["per_sec"] * (1 - threshold)
+        if results[name]["per_sec"] < floor:
+            regressions.append(f"{name}: {results[name]['per_sec']:.0f}/s, "
+                               f"baseline {base['per_sec']:.0f}/s")
+    return regressions
+
+
+def print_results(results, baseline=None):
+    for name, result in results.items():
+        line = f"{name:<42} {result['per_sec']:>12.0f}/s"
+        if baseline and name in baseline:
+            change = result["per_sec"] / baseline[name]["per_sec"] - 1
+            line += f"  ({change:+.1%} vs baseline)"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure move generation and agent throughput.",
+        epilog="Example: python benchmarks.py --save baseline.json",
+    )
+    parser.add_argument("games", nargs="*", type=str.lower,
+                        help="games to benchmark: tictactoe, checkers, reversi (default: all)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per throughput benchmark; the fastest is kept")
+    parser.add_argument("--save", metavar="FILE",
+                        help="write the results to FILE as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="fail if throughput fell below the JSON baseline in FILE")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed fractional drop against the baseline (default 0.2)")
+    args = parser.parse_args()
+
+    for game in args.games:
+        if game not in BENCH_GAMES:
+            print(f"Unsupported game: {game}")
+            sys.exit(1)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results, errors = run_benchmarks(args.games, repeat=args.repeat)
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    failures = list(errors)
+    if baseline is not None:
+        failures += compare(results, baseline, args.threshold)
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
@@ -1,24 +1,46 @@
+import argparse
+import cProfile
+import json
+import math
+import os
+import pstats
+import re
 import sys
 import time
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from problems import (
     TicTacToeState,
     CheckersState,
+    BitboardCheckersState,
     ReversiState,
+    BitboardReversiState,
     tictactoe_simple_heuristic,
     tictactoe_refined_heuristic,
+    tictactoe_oracle_heuristic,
+    tictactoe_table,
     checkers_simple_heuristic,
     checkers_refined_heuristic,
     reversi_simple_heuristic,
     reversi_refined_heuristic,
 )
-from algorithms import MinimaxAgent, MCTSAgent, RandomAgent
+from algorithms import (
+    MinimaxAgent,
+    MCTSAgent,
+    ParallelMCTSAgent,
+    RandomAgent,
+    OracleAgent,
+    SEARCH_MODES,
+)
+from position_cache import PositionCache
 
 # Available game classes
 GAMES = {
     "tictactoe": TicTacToeState,
     "checkers": CheckersState,
+    "checkers_bitboard": BitboardCheckersState,
     "reversi": ReversiState,
+    "reversi_bitboard": BitboardReversiState,
 }
 
 # Heuristic functions for Minimax agents
@@ -26,6 +48,7 @@ HEURISTICS = {
     "tictactoe": {
         "simple": tictactoe_simple_heuristic,
         "refined": tictactoe_refined_heuristic,
+        "exact": tictactoe_oracle_heuristic,
     },
     "checkers": {
         "simple": checkers_simple_heuristic,
@@ -36,91 +59,532 @@ HEURISTICS = {
         "refined": reversi_refined_heuristic,
     },
 }
+HEURISTICS["checkers_bitboard"] = HEURISTICS["checkers"]
+HEURISTICS["reversi_bitboard"] = HEURISTICS["reversi"]
+
+# Depth cap for Minimax when it deepens against a time budget instead
+ID_MAX_DEPTH = 64
 
-# Agent factory
-def get_agent(agent_name, game_name):
+# Agent factory. An agent name may carry a size after a colon: the search
+# depth for Minimax agents ("refined:5") or the number of simulations for
+# MCTS agents ("mcts:400").
+def get_agent(agent_name, game_name, max_depth=None, time_limit_ms=None, search="alphabeta",
+              mcts_workers=4, endgame_empties=0, position_cache=None):
+    agent_name, _, size = agent_name.partition(":")
+    num_simulations = None
+    if size:
+        if agent_name.startswith("mcts"):
+            num_simulations = int(size)
+        else:
+            max_depth = int(size)
     if agent_name == "random":
         return RandomAgent()
     elif agent_name == "mcts":
-        return MCTSAgent(num_simulations=100)
+        return MCTSAgent(num_simulations=num_simulations or 100)
+    elif agent_name == "mcts_flat":
+        return MCTSAgent(num_simulations=num_simulations or 100, use_tree=False)
+    elif agent_name == "mcts_batch":
+        return MCTSAgent(num_simulations=num_simulations or 1000, batch_size=100)
+    elif agent_name in ("mcts_root", "mcts_leaf"):
+        return ParallelMCTSAgent(num_simulations=num_simulations or 100, workers=mcts_workers,
+                                 mode=agent_name.split("_")[1])
+    elif agent_name == "oracle" and game_name == "tictactoe":
+        return OracleAgent(tictactoe_table())
     elif agent_name in HEURISTICS[game_name]:
-        return MinimaxAgent(max_depth=3, eval_fn=HEURISTICS[game_name][agent_name])
+        if max_depth is None:
+            max_depth = 3 if time_limit_ms is None else ID_MAX_DEPTH
+        return MinimaxAgent(max_depth=max_depth, eval_fn=HEURISTICS[game_name][agent_name],
+                            use_move_ordering=True, tt_entries=2 ** 20,
+                            time_limit_ms=time_limit_ms, search=search,
+                            batch_eval=(game_name == "reversi"),
+                            endgame_empties=endgame_empties,
+                            position_cache=position_cache)
     else:
         raise ValueError(f"Unknown agent: {agent_name}")
 
-# Add two random opening moves
-def add_random_openings(state):
+# Add two random opening moves, appending them to `played` if given
+def add_random_openings(state, played=None):
     for _ in range(2):  # One move for each player
         legal = state.get_legal_moves()
         if not legal:
             break
         random_move = random.choice(legal)
         state = state.apply_move(random_move)
+        if played is not None:
+            played.append(random_move)
     return state
 
-# Main function to run experiments
-def run_games(game_name, agent1_name, agent2_name, num_games):
-    GameClass = GAMES[game_name]
-    agent1 = get_agent(agent1_name, game_name)
-    agent2 = get_agent(agent2_name, game_name)
-    agents = {1: agent1, -1: agent2}
+def decode_move(move):
+    """A move read back from JSON, with its arrays turned back into tuples."""
+    if isinstance(move, list):
+        return tuple(decode_move(part) for part in move)
+    return move
+
+def game_seed(base_seed, game_index):
+    """Seed for one game, fixed by the run seed and the game's index alone."""
+    return random.Random(f"{base_seed}-{game_index}").getrandbits(32)
+
+def add_stats(totals, summary):
+    for key, value in summary.items():
+        totals[key] = totals.get(key, 0) + value
+
+def print_agent_stats(label, totals):
+    """One line of search work per agent, from summed SearchStats summaries."""
+    moves = totals.get("moves", 0)
+    if moves == 0:
+        print(f"{label}: no search statistics")
+        return
+    parts = [f"{moves} moves", f"{totals['time'] / moves:.4f}s/move"]
+    if totals["nodes"]:
+        depth = totals["depth"] / moves
+        nodes = totals["nodes"] / moves
+        parts += [f"{totals['nodes'] / totals['time']:,.0f} nodes/s",
+                  f"{nodes:,.0f} nodes/move",
+                  f"{totals['leaves'] / moves:,.0f} leaves/move",
+                  f"{totals['cutoffs'] / moves:,.0f} cutoffs/move",
+                  f"depth {depth:.1f}"]
+        if depth > 0:
+            parts.append(f"EBF {nodes ** (1.0 / depth):.2f}")
+        if totals.get("tt_probes"):
+            parts += [f"TT hits {totals['tt_hits'] / totals['tt_probes']:.1%}",
+                      f"{totals['tt_collisions'] / moves:,.0f} TT collisions/move"]
+    if totals["rollouts"]:
+        parts += [f"{totals['rollouts'] / totals['time']:,.0f} rollouts/s",
+                  f"{totals['rollouts'] / moves:,.0f} rollouts/move",
+                  f"{totals['rollout_plies'] / totals['rollouts']:.1f} plies/rollout"]
+    print(f"{label}: " + ", ".join(parts))
+
+# Games are split into thirds by move number for the per-phase latencies
+PHASES = ("opening", "middlegame", "endgame")
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil(n * q / 100)
+    return ordered[int(rank) - 1]
 
-    wins = {1: 0, -1: 0, 0: 0}
-    total_moves = 0
-    total_time = 0.0
+def latency_summary(values):
+    ms = [1000 * seconds for seconds in values]
+    return (f"mean {sum(ms) / len(ms):.2f}ms, p50 {percentile(ms, 50):.2f}ms, "
+            f"p95 {percentile(ms, 95):.2f}ms, max {max(ms):.2f}ms")
 
-    for i in range(num_games):
+def print_agent_latency(label, latencies):
+    """Move latency distribution of one agent, overall and per game phase."""
+    if not latencies:
+        print(f"{label}: no moves")
+        return
+    print(f"{label}: {len(latencies)} moves, "
+          f"{latency_summary([seconds for _, seconds in latencies])}")
+    for phase, name in enumerate(PHASES):
+        values = [seconds for p, seconds in latencies if p == phase]
+        if values:
+            print(f"    {name:<10} {len(values):>5} moves, {latency_summary(values)}")
+
+def profile_path(profile_dir, agent_name, player, seed=None):
+    side = "p1" if player == 1 else "p2"
+    suffix = "" if seed is None else f"_{seed}"
+    # Agent names may carry a size ("refined:4"); keep filenames portable
+    name = re.sub(r"[^A-Za-z0-9_.-]", "-", agent_name)
+    return os.path.join(profile_dir, f"{name}_{side}{suffix}.prof")
+
+def merge_profiles(profile_dir, agent_name, player, seeds, top):
+    """Merge one agent's per-game profiles into a single dump and print its hot spots."""
+    paths = [profile_path(profile_dir, agent_name, player, seed) for seed in seeds]
+    stats = pstats.Stats(*paths)
+    for path in paths:
+        os.remove(path)
+    merged = profile_path(profile_dir, agent_name, player)
+    stats.dump_stats(merged)
+    print(f"\nProfile of {agent_name} (player {player}) written to {merged}")
+    stats.sort_stats("tottime").print_stats(top)
+
+# Play one game with freshly built agents, so its result depends only on
+# its seed and not on which worker ran it or what that worker played before
+def play_game(game_name, agent1_name, agent2_name, seed, agent_options, profile_dir=None,
+              cache_path=None):
+    random.seed(seed)
+    GameClass = GAMES[game_name]
+    # Games read the cache file as it was when the run started; what they
+    # learn is handed back to run_games to merge once all games are done
+    cache = PositionCache(cache_path) if cache_path is not None else None
+    agents = {
+        1: get_agent(agent1_name, game_name, position_cache=cache, **agent_options),
+        -1: get_agent(agent2_name, game_name, position_cache=cache, **agent_options),
+    }
+    try:
         state = GameClass(player=1)
-        state = add_random_openings(state)  # Inject randomness
+        move_list = []  # every move from the initial position, openings included
+        state = add_random_openings(state, move_list)  # Inject randomness
         move_count = 0
+        stats = {1: {}, -1: {}}
+        latencies = {1: [], -1: []}  # (move number, seconds) per player
+        profilers = None
+        if profile_dir is not None:
+            profilers = {1: cProfile.Profile(), -1: cProfile.Profile()}
         start_time = time.perf_counter()
 
         while not state.is_terminal():
             agent = agents[state.player]
+            move_start = time.perf_counter()
+            if profilers:
+                profilers[state.player].enable()
             move = agent.select_move(state)
+            if profilers:
+                profilers[state.player].disable()
+            latencies[state.player].append((move_count, time.perf_counter() - move_start))
+            if hasattr(agent, "stats"):
+                add_stats(stats[state.player], agent.stats.summary())
             if move is None:
                 break
             state = state.apply_move(move)
+            move_list.append(move)
             move_count += 1
 
-        end_time = time.perf_counter()
-        game_time = end_time - start_time
-        total_time += game_time
-        total_moves += move_count
+        game_time = time.perf_counter() - start_time
+    finally:
+        # Parallel agents hold a process pool
+        for agent in agents.values():
+            if hasattr(agent, "close"):
+                agent.close()
+        if cache is not None:
+            cache.close()
 
-        winner = state.get_winner()
+    if profilers:
+        for player, name in ((1, agent1_name), (-1, agent2_name)):
+            profilers[player].dump_stats(profile_path(profile_dir, name, player, seed))
 
-        # Safely handle all possible outcomes
-        if winner in [1, -1]:
-            wins[winner] += 1
-            winner_str = f"{winner}"
-        else:
-            wins[0] += 1
-            winner_str = "Draw"
+    # Tag each move with the third of this game it was played in
+    phases = {
+        player: [(min(2, 3 * number // max(move_count, 1)), seconds)
+                 for number, seconds in latencies[player]]
+        for player in (1, -1)
+    }
+    winner = state.get_winner()
+    return {
+        "winner": int(winner) if winner in [1, -1] else 0,
+        "plies": move_count,
+        "move_list": move_list,
+        "time": game_time,
+        "stats": stats,
+        "latencies": phases,
+        "cache": None if cache is None else {
+            "probes": cache.probes,
+            "hits": cache.hits,
+            "records": cache.records(),
+        },
+    }
+
+# Streamed results: a JSONL file with a "run" header line describing the
+# run, then one "game" line per finished game, written as soon as it ends
+def run_header(game_name, agent1_name, agent2_name, seed, agent_options):
+    return {"type": "run", "game": game_name, "agent1": agent1_name, "agent2": agent2_name,
+            "seed": seed, "options": agent_options}
+
+def game_record(index, seed, result):
+    return {
+        "type": "game",
+        "index": index,
+        "seed": seed,
+        "winner": result["winner"],
+        "plies": result["plies"],
+        "move_list": result["move_list"],
+        "time": result["time"],
+        "agent_time": {str(p): sum(s for _, s in result["latencies"][p]) for p in (1, -1)},
+        "stats": {str(p): result["stats"][p] for p in (1, -1)},
+        "latencies": {str(p): result["latencies"][p] for p in (1, -1)},
+    }
+
+def result_from_record(record):
+    return {
+        "winner": record["winner"],
+        "plies": record["plies"],
+        "move_list": [decode_move(move) for move in record["move_list"]],
+        "time": record["time"],
+        "stats": {p: record["stats"][str(p)] for p in (1, -1)},
+        "latencies": {p: [tuple(x) for x in record["latencies"][str(p)]] for p in (1, -1)},
+        "cache": None,
+    }
+
+def load_results(path):
+    """Run header and {game index: result} from a results file."""
+    header = None
+    results = {}
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short when an earlier run was interrupted
+            if record["type"] == "run":
+                header = record
+            elif record["type"] == "game":
+                results[record["index"]] = result_from_record(record)
+    return header, results
 
-        print(f"Game {i+1}: Winner = {winner_str}, Moves = {move_count}, Time = {game_time:.2f}s")
+# Sequential probability ratio test on the score of agent1 (win 1, draw 1/2,
+# loss 0): H0 says it is elo0 stronger than agent2, H1 says elo1
+def elo_to_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
 
-    print(f"\nResults after {num_games} games:")
-    print(f"{agent1_name} wins: {wins[1]}")
-    print(f"{agent2_name} wins: {wins[-1]}")
-    print(f"Draws: {wins[0]}")
-    print(f"Average moves per game: {total_moves / num_games:.2f}")
-    print(f"Average time per move: {total_time / total_moves:.4f} seconds")
+def score_to_elo(score):
+    if score <= 0:
+        return -float("inf")
+    if score >= 1:
+        return float("inf")
+    return -400 * math.log10(1 / score - 1)
+
+def sprt_llr(wins, losses, draws, elo0, elo1):
+    """Log-likelihood ratio of H1 against H0, in the normal approximation.
+
+    Half a win and half a loss are added to the variance estimate, so a
+    match that one side wins every game of can still be decided.
+    """
+    n = wins + losses + draws
+    if n == 0:
+        return 0.0
+    w, l = wins + 0.5, losses + 0.5
+    mean = (w + 0.5 * draws) / (w + l + draws)
+    variance = (w * (1 - mean) ** 2 + l * mean ** 2 + draws * (0.5 - mean) ** 2) / (w + l + draws)
+    s0, s1 = elo_to_score(elo0), elo_to_score(elo1)
+    score = (wins + 0.5 * draws) / n
+    return n * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+def sprt_bounds(alpha, beta):
+    """(lower, upper) LLR bounds for false positive rate alpha and false negative rate beta."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def score_interval(wins, losses, draws, z=1.96):
+    """Mean score of agent1 with a normal-approximation confidence interval."""
+    n = wins + losses + draws
+    mean = (wins + 0.5 * draws) / n
+    variance = (wins * (1 - mean) ** 2 + losses * mean ** 2 + draws * (0.5 - mean) ** 2) / n
+    margin = z * math.sqrt(variance / n)
+    return mean, max(0.0, mean - margin), min(1.0, mean + margin)
+
+# Main function to run experiments
+def run_games(game_name, agent1_name, agent2_name, num_games, max_depth=None,
+              time_limit_ms=None, search="alphabeta", mcts_workers=4, workers=1, seed=None,
+              profile_dir=None, profile_top=15, endgame_empties=0, cache_path=None,
+              results_path=None, resume=False, sprt=None, sprt_alpha=0.05, sprt_beta=0.05):
+    agent_options = {
+        "max_depth": max_depth,
+        "time_limit_ms": time_limit_ms,
+        "search": search,
+        "mcts_workers": mcts_workers,
+        "endgame_empties": endgame_empties,
+    }
+    results = {}  # game index -> result, including games resumed from results_path
+    if resume:
+        if results_path is None or not os.path.exists(results_path):
+            raise ValueError("--resume needs an existing --results file")
+        header, results = load_results(results_path)
+        if header is None:
+            raise ValueError(f"{results_path} has no run header")
+        expected = run_header(game_name, agent1_name, agent2_name, header["seed"], agent_options)
+        if header != expected or (seed is not None and seed != header["seed"]):
+            raise ValueError(f"{results_path} was written by a run with different settings")
+        seed = header["seed"]
+    elif results_path is not None and os.path.exists(results_path):
+        raise ValueError(f"{results_path} exists; pass --resume to continue it")
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    print(f"Seed: {seed}")
+    if results:
+        print(f"Resuming: {len(results)} games already in {results_path}")
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+    if cache_path is not None:
+        PositionCache(cache_path).close()  # create it before any worker opens it
+
+    results_file = None
+    if results_path is not None:
+        results_file = open(results_path, "a")
+        if not resume:
+            results_file.write(json.dumps(run_header(game_name, agent1_name, agent2_name,
+                                                     seed, agent_options)) + "\n")
+        elif results_file.tell() > 0:
+            # Start on a fresh line after a record cut short by an interruption
+            with open(results_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    results_file.write("\n")
+        results_file.flush()
+
+    # The SPRT looks at games in index order, so it stops at the same game
+    # with any number of workers
+    counted = 0
+    wdl = {1: 0, -1: 0, 0: 0}
+    decision = None
+    llr = 0.0
+    if sprt is not None:
+        lower, upper = sprt_bounds(sprt_alpha, sprt_beta)
+
+    def advance():
+        nonlocal counted, decision, llr
+        while decision is None and counted < num_games and counted in results:
+            wdl[results[counted]["winner"]] += 1
+            counted += 1
+            if sprt is not None:
+                llr = sprt_llr(wdl[1], wdl[-1], wdl[0], *sprt)
+                if llr >= upper:
+                    decision = "H1"
+                elif llr <= lower:
+                    decision = "H0"
+
+    played = []  # games played by this invocation
+
+    def record(i, result):
+        results[i] = result
+        played.append(i)
+        if results_file is not None:
+            results_file.write(json.dumps(game_record(i, game_seed(seed, i), result)) + "\n")
+            results_file.flush()
+        winner_str = f"{result['winner']}" if result["winner"] != 0 else "Draw"
+        print(f"Game {i+1}: Winner = {winner_str}, Moves = {result['plies']}, "
+              f"Time = {result['time']:.2f}s")
+        advance()
+
+    advance()
+    remaining = [i for i in range(num_games) if i not in results]
+    try:
+        if workers <= 1:
+            for i in remaining:
+                if decision is not None:
+                    break
+                record(i, play_game(game_name, agent1_name, agent2_name,
+                                    game_seed(seed, i), agent_options, profile_dir, cache_path))
+        elif remaining and decision is None:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(play_game, game_name, agent1_name, agent2_name,
+                                game_seed(seed, i), agent_options, profile_dir, cache_path): i
+                    for i in remaining
+                }
+                # Report games as they finish, whatever order that is
+                for future in as_completed(futures):
+                    if future.cancelled():
+                        continue
+                    record(futures[future], future.result())
+                    if decision is not None:
+                        # Games already running still finish and are saved
+                        for other in futures:
+                            other.cancel()
+    finally:
+        if results_file is not None:
+            results_file.close()
+
+    # The summary covers the games the SPRT looked at, or all of them
+    games = list(range(counted))
+    total_moves = sum(results[i]["plies"] for i in games)
+    total_time = sum(results[i]["time"] for i in games)
+    agent_stats = {1: {}, -1: {}}
+    agent_latencies = {1: [], -1: []}
+    for i in games:
+        for player in (1, -1):
+            add_stats(agent_stats[player], results[i]["stats"][player])
+            agent_latencies[player].extend(results[i]["latencies"][player])
+
+    print(f"\nResults after {counted} games:")
+    print(f"{agent1_name} wins: {wdl[1]}")
+    print(f"{agent2_name} wins: {wdl[-1]}")
+    print(f"Draws: {wdl[0]}")
+    if counted == 0:
+        return
+    print(f"Average moves per game: {total_moves / counted:.2f}")
+    print(f"Average time per move: {total_time / max(total_moves, 1):.4f} seconds")
+    score, low, high = score_interval(wdl[1], wdl[-1], wdl[0])
+    print(f"Score of {agent1_name}: {score:.3f} (95% CI {low:.3f} to {high:.3f}), "
+          f"Elo difference {score_to_elo(score):+.0f} "
+          f"({score_to_elo(low):+.0f} to {score_to_elo(high):+.0f})")
+    if sprt is not None:
+        verdict = {
+            "H1": f"H1 accepted: {agent1_name} is about {sprt[1]:+g} Elo or stronger",
+            "H0": f"H0 accepted: {agent1_name} is about {sprt[0]:+g} Elo or weaker",
+            None: "no decision yet",
+        }[decision]
+        print(f"SPRT({sprt[0]:g}, {sprt[1]:g}): LLR {llr:.2f} "
+              f"(bounds {lower:.2f}, {upper:.2f}), {verdict}")
+    print("\nMove latency:")
+    print_agent_latency(f"{agent1_name} (player 1)", agent_latencies[1])
+    print_agent_latency(f"{agent2_name} (player -1)", agent_latencies[-1])
+    print("\nSearch statistics:")
+    print_agent_stats(f"{agent1_name} (player 1)", agent_stats[1])
+    print_agent_stats(f"{agent2_name} (player -1)", agent_stats[-1])
+
+    cache_results = {i: results[i]["cache"] for i in played if results[i]["cache"] is not None}
+    if cache_path is not None and cache_results:
+        # Merge in game order, so the file ends up the same with any number
+        # of workers
+        cache = PositionCache(cache_path)
+        for i in sorted(cache_results):
+            cache.update(cache_results[i]["records"])
+        queued = len(cache.pending)
+        stored = cache.merge()
+        cache.close()
+        probes = sum(result["probes"] for result in cache_results.values())
+        hits = sum(result["hits"] for result in cache_results.values())
+        print(f"\nPosition cache {cache_path}: {hits:,} of {probes:,} probes hit, "
+              f"{stored:,} of {queued:,} new entries stored")
+
+    if profile_dir is not None and played:
+        seeds = [game_seed(seed, i) for i in sorted(played)]
+        merge_profiles(profile_dir, agent1_name, 1, seeds, profile_top)
+        merge_profiles(profile_dir, agent2_name, -1, seeds, profile_top)
 
 # Command-line usage
 if __name__ == "__main__":
-    if len(sys.argv) < 5:
-        print("Usage: python comparisons.py [game] [agent1] [agent2] [num_games]")
-        print("Example: python comparisons.py checkers simple refined 30")
-        sys.exit(1)
-
-    game_name = sys.argv[1].lower()
-    agent1_name = sys.argv[2].lower()
-    agent2_name = sys.argv[3].lower()
-    num_games = int(sys.argv[4])
+    parser = argparse.ArgumentParser(
+        description="Run automated games between two agents.",
+        epilog="Example: python comparisons.py checkers simple refined 30",
+    )
+    parser.add_argument("game", type=str.lower)
+    parser.add_argument("agent1", type=str.lower)
+    parser.add_argument("agent2", type=str.lower)
+    parser.add_argument("num_games", type=int)
+    parser.add_argument("--depth", type=int, default=None,
+                        help="Minimax search depth (default 3, or the deepening cap with --time-ms)")
+    parser.add_argument("--time-ms", type=float, default=None,
+                        help="per-move budget for Minimax agents, searched by iterative deepening")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="alphabeta",
+                        help="Minimax search: plain alpha-beta or negamax PVS with aspiration windows")
+    parser.add_argument("--endgame", type=int, default=0, metavar="EMPTIES",
+                        help="Reversi Minimax agents solve exactly with at most this many "
+                             "empty squares left (default 0: off)")
+    parser.add_argument("--cache", metavar="FILE", default=None,
+                        help="persistent position cache shared by Minimax agents across "
+                             "runs; created if missing and merged into after the run")
+    parser.add_argument("--mcts-workers", type=int, default=4,
+                        help="process pool size for the mcts_root and mcts_leaf agents")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of games to play in parallel processes")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="run seed; each game's seed derives from it and the game number")
+    parser.add_argument("--results", metavar="FILE", default=None,
+                        help="stream each finished game to FILE as a JSON line")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the run recorded in --results, skipping finished games")
+    parser.add_argument("--sprt", nargs=2, type=float, metavar=("ELO0", "ELO1"), default=None,
+                        help="stop once a sequential probability ratio test decides between "
+                             "agent1 being ELO0 and ELO1 Elo stronger than agent2")
+    parser.add_argument("--sprt-alpha", type=float, default=0.05,
+                        help="SPRT false positive rate (default 0.05)")
+    parser.add_argument("--sprt-beta", type=float, default=0.05,
+                        help="SPRT false negative rate (default 0.05)")
+    parser.add_argument("--profile", nargs="?", const="profiles", default=None, metavar="DIR",
+                        help="profile each agent's moves with cProfile and write one dump "
+                             "per agent to DIR (default: profiles)")
+    parser.add_argument("--profile-top", type=int, default=15,
+                        help="hot functions to list per agent with --profile")
+    args = parser.parse_args()
 
-    if game_name not in GAMES:
-        print(f"Unsupported game: {game_name}")
+    if args.game not in GAMES:
+        print(f"Unsupported game: {args.game}")
         sys.exit(1)
 
-    run_games(game_name, agent1_name, agent2_name, num_games)
+    run_games(args.game, args.agent1, args.agent2, args.num_games,
+              max_depth=args.depth, time_limit_ms=args.time_ms, search=args.search,
+              mcts_workers=args.mcts_workers, workers=args.workers, seed=args.seed,
+              profile_dir=args.profile, profile_top=args.profile_top,
+              endgame_empties=args.endgame, cache_path=args.cache,
+              results_path=args.results, resume=args.resume, sprt=args.sprt,
+              sprt_alpha=args.sprt_alpha, sprt_beta=args.sprt_beta)
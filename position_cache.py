@@ -0,0 +1,212 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: merges are not locked against each other
+    fcntl = None
+
+# ---------------------------------------------
+# On-disk position cache
+# ---------------------------------------------
+# A file of fixed-size hash buckets, each holding a few records of
+# (key, score, depth, move index, bound). Readers map the file read-only, so
+# every process of a run shares the operating system's copy of its pages.
+# New entries stay in memory until merge(), which rewrites the file under
+# an exclusive lock and swaps it in with os.replace. A process that still
+# has the old file mapped keeps reading a consistent snapshot.
+#
+# The best move is stored as its index in the position's get_legal_moves()
+# list, which every state generates in a fixed order, so records work for
+# any game. Keys are 64-bit position hashes already mixed with the
+# searcher's own salts; namespace_salt() separates games and heuristics,
+# whose scores must never be mixed.
+
+CACHE_MAGIC = b"POSCACHE"
+CACHE_VERSION = 1
+HEADER = struct.Struct("<8sIII")      # magic, version, buckets, slots per bucket
+RECORD = struct.Struct("<QdhhBBxx")   # key, score, depth, move index, bound, used
+
+
+def namespace_salt(name):
+    """Stable 64-bit salt for a namespace such as "ReversiState/reversi_refined_heuristic"."""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little")
+
+
+class PositionCache:
+    def __init__(self, path, buckets=2 ** 16, slots=4, min_depth=2):
+        """
+        path: str - cache file; created empty if missing
+        buckets, slots: int - layout of a new file (an existing file keeps its own)
+        min_depth: int - searches shallower than this are not worth recording
+        """
+        self.path = path
+        self.min_depth = min_depth
+        self.pending = {}  # key -> (depth, score, bound, move index), not yet merged
+        self.probes = 0
+        self.hits = 0
+        if not os.path.exists(path):
+            with self.locked():
+                if not os.path.exists(path):
+                    self.write_file(self.empty_file(buckets, slots))
+        self.map = None
+        self.open()
+
+    def open(self):
+        with open(self.path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.buckets, self.slots = HEADER.unpack_from(self.map, 0)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            self.map.close()
+            raise ValueError(f"{self.path} is not a version {CACHE_VERSION} position cache")
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+    def empty_file(self, buckets, slots):
+        data = bytearray(HEADER.size + buckets * slots * RECORD.size)
+        HEADER.pack_into(data, 0, CACHE_MAGIC, CACHE_VERSION, buckets, slots)
+        return data
+
+    def probe(self, key):
+        """Return (depth, score, bound, move index) for key, or None.
+
+        The move index points into the position's get_legal_moves() list and
+        is -1 when no best move was recorded; decoding it is left to the
+        caller, which only needs the move if the entry does not cut off.
+        """
+        self.probes += 1
+        entry = self.pending.get(key)
+        if entry is None:
+            entry = self.read(self.map, key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def read(self, data, key):
+        offset = HEADER.size + (key % self.buckets) * self.slots * RECORD.size
+        for _ in range(self.slots):
+            stored_key, score, depth, move_index, bound, used = RECORD.unpack_from(data, offset)
+            if used and stored_key == key:
+                return depth, score, bound, move_index
+            offset += RECORD.size
+        return None
+
+    def record(self, key, depth, score, bound, move_index):
+        """Queue an entry for the next merge; the deepest search of a key wins."""
+        entry = self.pending.get(key)
+        if entry is None or depth >= entry[0]:
+            self.pending[key] = (depth, score, bound, move_index)
+
+    def update(self, records):
+        """Queue (key, depth, score, bound, move index) records from another process."""
+        for key, depth, score, bound, move_index in records:
+            self.record(key, depth, score, bound, move_index)
+
+    def records(self):
+        return [(key,) + entry for key, entry in self.pending.items()]
+
+    def merge(self):
+        """Write pending entries back to the file; returns how many were stored."""
+        if not self.pending:
+            return 0
+        stored = 0
+        with self.locked():
+            # Start from the file as it is now, which another run may have
+            # merged into since this one opened it
+            with open(self.path, "rb") as f:
+                data = bytearray(f.read())
+            for key, (depth, score, bound, move_index) in self.pending.items():
+                stored += self.place(data, key, depth, score, bound, move_index)
+            self.close()
+            self.write_file(data)
+        self.pending = {}
+        self.open()
+        return stored
+
+    def place(self, data, key, depth, score, bound, move_index):
+        """Put one entry in its bucket: replace the same key if at least as deep,
+        else fill an empty slot, else evict the shallowest entry if no deeper."""
+        base = HEADER.size + (key % self.buckets) * self.slots * RECORD.size
+        empty = None
+        shallowest = None
+        for slot in range(self.slots):
+            offset = base + slot * RECORD.size
+            stored_key, _, stored_depth, _, _, used = RECORD.unpack_from(data, offset)
+            if not used:
+                if empty is None:
+                    empty = offset
+            elif stored_key == key:
+                if depth < stored_depth:
+                    return 0
+                empty = offset
+                break
+            elif shallowest is None or stored_depth < shallowest[1]:
+                shallowest = (offset, stored_depth)
+        if empty is not None:
+            offset = empty
+        elif depth >= shallowest[1]:
+            offset = shallowest[0]
+        else:
+            return 0
+        RECORD.pack_into(data, offset, key, score, depth, move_index, bound, 1)
+        return 1
+
+    def write_file(self, data):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            # mkstemp creates the file 0600; keep the cache readable by every
+            # user and service that shares it, as a plain open() would
+            if os.path.exists(self.path):
+                mode = os.stat(self.path).st_mode & 0o777
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o644 & ~umask
+            if hasattr(os, "fchmod"):
+                os.fchmod(fd, mode)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def locked(self):
+        return CacheLock(self.path + ".lock")
+
+    def __len__(self):
+        """Entries stored in the file (pending entries not included)."""
+        count = 0
+        for index in range(self.buckets * self.slots):
+            if RECORD.unpack_from(self.map, HEADER.size + index * RECORD.size)[5]:
+                count += 1
+        return count
+
+
+class CacheLock:
+    """Exclusive flock on a side file, held for the body of a with block."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
+        self.file = None
@@ -1,45 +1,164 @@
 import numpy as np
 import random
 
+# -------------------
+# Zobrist hashing
+# -------------------
+
+# One random 64-bit key per (piece, square), drawn from a fixed seed so a
+# position hashes the same in every run and worker process. ZOBRIST_SIDE is
+# mixed in whenever player -1 is to move. Checkers and Reversi keys are
+# indexed by i * 8 + j, so the NumPy and bitboard states hash alike.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+TTT_ZOBRIST = {p: [_zobrist_rng.getrandbits(64) for _ in range(9)] for p in (1, -1)}
+CHECKERS_ZOBRIST = {p: [_zobrist_rng.getrandbits(64) for _ in range(64)] for p in (1, -1, 2, -2)}
+REVERSI_ZOBRIST = {p: [_zobrist_rng.getrandbits(64) for _ in range(64)] for p in (1, -1)}
+# Flipping a Reversi disc swaps one colour's key for the other's
+REVERSI_FLIP_ZOBRIST = [a ^ b for a, b in zip(REVERSI_ZOBRIST[1], REVERSI_ZOBRIST[-1])]
+
+
+def zobrist_hash(board, player, keys):
+    """Hash a NumPy board from scratch; states update it incrementally."""
+    h = ZOBRIST_SIDE if player == -1 else 0
+    for k, x in enumerate(np.asarray(board).reshape(-1)):
+        if x != 0:
+            h ^= keys[int(x)][k]
+    return h
+
+# -------------------
+# Packed positions
+# -------------------
+
+# pack() turns a state into one immutable int holding its board and side to
+# move, and the class method from_packed() turns it back into a state. The
+# NumPy and bitboard states of a game pack alike, so either can rebuild the
+# other's positions. Layouts, lowest bits first:
+#   Tic Tac Toe  the base-3 board code (see tictactoe_code), 15 bits
+#   Checkers     white men, black men, white kings, black kings, 32 bits each
+#   Reversi      white discs, black discs, 64 bits each
+# then one bit set when player -1 is to move.
+#
+# States also hash by their Zobrist key and compare equal when they hold the
+# same position and side to move, so they work as dict and set keys. A
+# state used as a key must not be moved with make_move; packed ints are the
+# safe and compact choice for large or long-lived tables.
+TTT_SIDE_BIT = 1 << 15
+CHECKERS_SIDE_BIT = 1 << 128
+REVERSI_SIDE_BIT = 1 << 128
+
+
+def bits_from_cells(cells):
+    """Integer with bit k set where the flat boolean array `cells` is true at k."""
+    return int.from_bytes(np.packbits(cells, bitorder="little").tobytes(), "little")
+
+# -------------------
+# Staged move generation
+# -------------------
+
+# Besides get_legal_moves, every state offers iter_move_stages(), which
+# yields the legal moves a few at a time, highest move_priority class first
+# (captures before quiet moves, corners before edges). Reversi states build
+# a stage only when the caller reaches it and keep it until the next
+# make_move, so a search that cuts off early never pays for the later
+# stages. is_legal_move(move) checks one move, such as a hash move, on its own.
+
+def cached_stages(state, count):
+    """Yield state.generate_stage(0) ... generate_stage(count - 1), each built once per position."""
+    if state._stages is None:
+        state._stages = []
+    stages = state._stages  # unmake_move restores this same list
+    for k in range(count):
+        if k == len(stages):
+            stages.append(state.generate_stage(k))
+        yield stages[k]
+
 # -------------------
 # Tic Tac Toe
 # -------------------
 
 class TicTacToeState:
-    def __init__(self, board=None, player=1):
+    __slots__ = ("board", "code", "zobrist", "player", "undo_stack", "_moves")
+
+    def __init__(self, board=None, player=1, code=None, zobrist=None):
         if board is None:
             self.board = np.zeros((3,3), dtype=int)
+            code = 0
         else:
             self.board = board
+        if code is None:
+            code = tictactoe_code(board)
+        if zobrist is None:
+            zobrist = zobrist_hash(self.board, player, TTT_ZOBRIST)
+        self.code = code  # base-3 index into the perfect-play table
+        self.zobrist = zobrist
         self.player = player
+        self.undo_stack = []
+        self._moves = None
 
     def get_legal_moves(self):
-        return [(i, j) for i in range(3) for j in range(3) if self.board[i, j] == 0]
+        """Legal moves, computed once per position; callers must not mutate the list."""
+        if self._moves is None:
+            self._moves = list(tictactoe_table().moves[self.code])
+        return self._moves
+
+    def iter_move_stages(self):
+        # The moves are a table lookup, so there is nothing to save by staging
+        yield self.get_legal_moves()
+
+    def is_legal_move(self, move):
+        return move in self.get_legal_moves()
+
+    def copy(self):
+        return TicTacToeState(self.board.copy(), self.player, self.code, self.zobrist)
+
+    def pack(self):
+        return self.code | (TTT_SIDE_BIT if self.player == -1 else 0)
+
+    @classmethod
+    def from_packed(cls, packed):
+        code = packed & (TTT_SIDE_BIT - 1)
+        board = np.array([TTT_CELL_VALUES[(code // TTT_POWERS[k]) % 3] for k in range(9)])
+        return cls(board.reshape(3, 3), -1 if packed & TTT_SIDE_BIT else 1, code)
+
+    def __eq__(self, other):
+        if not isinstance(other, TicTacToeState):
+            return NotImplemented
+        return self.code == other.code and self.player == other.player
+
+    def __hash__(self):
+        return self.zobrist
 
     def apply_move(self, move):
+        child = self.copy()
+        child.make_move(move)
+        child.undo_stack.pop()  # the child starts with a fresh history
+        return child
+
+    def make_move(self, move):
+        """Play `move` in place, pushing an undo record for unmake_move."""
         i, j = move
-        new_board = self.board.copy()
-        new_board[i, j] = self.player
-        return TicTacToeState(new_board, -self.player)
+        self.undo_stack.append((move, self.code, self.zobrist, self._moves))
+        self.board[i, j] = self.player
+        self.code += TTT_DIGITS[self.player] * TTT_POWERS[3 * i + j]
+        self.zobrist ^= TTT_ZOBRIST[self.player][3 * i + j] ^ ZOBRIST_SIDE
+        self.player = -self.player
+        self._moves = None
+
+    def unmake_move(self):
+        (i, j), self.code, self.zobrist, self._moves = self.undo_stack.pop()
+        self.board[i, j] = 0
+        self.player = -self.player
 
     def is_terminal(self):
-        if self.get_winner() is not None:
-            return True
-        return len(self.get_legal_moves()) == 0
+        return tictactoe_table().terminal[self.code]
 
     def get_winner(self):
-        for i in range(3):
-            if abs(sum(self.board[i, :])) == 3:
-                return np.sign(sum(self.board[i, :]))
-            if abs(sum(self.board[:, i])) == 3:
-                return np.sign(sum(self.board[:, i]))
-        diag1 = sum(self.board[i, i] for i in range(3))
-        if abs(diag1) == 3:
-            return np.sign(diag1)
-        diag2 = sum(self.board[i, 2 - i] for i in range(3))
-        if abs(diag2) == 3:
-            return np.sign(diag2)
-        return None
+        return tictactoe_table().winner[self.code]
+
+    def move_priority(self, move):
+        """Static ordering hint for search: centre, then corners, then edges."""
+        return TTT_MOVE_PRIORITY[move[0]][move[1]]
 
     def print_board(self):
         symbols = {1: "X", -1: "O", 0: "."}
@@ -47,6 +166,100 @@ class TicTacToeState:
             print(" ".join(symbols[x] for x in row))
         print()
 
+# Static move-ordering priority: centre 2, corners 1, edges 0
+TTT_MOVE_PRIORITY = [
+    [1, 0, 1],
+    [0, 2, 0],
+    [1, 0, 1],
+]
+
+# --- Perfect-play table for Tic Tac Toe ---
+
+# A board is encoded in base 3 with cell (i, j) as digit 3 * i + j:
+# 0 for empty, 1 for player 1 and 2 for player -1.
+TTT_POWERS = [3 ** k for k in range(9)]
+TTT_DIGITS = {0: 0, 1: 1, -1: 2}
+TTT_CELL_VALUES = (0, 1, -1)
+
+# Lines in the order the original row/column/diagonal scan checked them, so
+# a (malformed) board with two completed lines reports the same winner.
+TTT_LINES = [line for i in range(3) for line in ([3 * i, 3 * i + 1, 3 * i + 2], [i, 3 + i, 6 + i])]
+TTT_LINES += [[0, 4, 8], [2, 4, 6]]
+
+
+def tictactoe_code(board):
+    return sum(TTT_DIGITS[int(x)] * TTT_POWERS[k]
+               for k, x in enumerate(np.asarray(board).reshape(9)))
+
+
+class TicTacToeTable:
+    """Every 3x3 board solved once, indexed by its base-3 code.
+
+    `winner`, `terminal` and `moves` depend only on the board. `value[p]`
+    holds the game-theoretic result (1, -1 or 0, from player 1's point of
+    view) with player p to move. Values are filled retrogradely: boards are
+    visited from fewest to most empty squares, so every child is already
+    solved when its parent is.
+    """
+
+    def __init__(self):
+        size = 3 ** 9
+        self.winner = [None] * size
+        self.terminal = [False] * size
+        self.moves = [()] * size
+        self.value = {1: [0] * size, -1: [0] * size}
+        by_empties = [[] for _ in range(10)]
+
+        for code in range(size):
+            cells = [TTT_CELL_VALUES[(code // TTT_POWERS[k]) % 3] for k in range(9)]
+            winner = None
+            for line in TTT_LINES:
+                total = cells[line[0]] + cells[line[1]] + cells[line[2]]
+                if abs(total) == 3:
+                    winner = total // 3
+                    break
+            empties = [k for k in range(9) if cells[k] == 0]
+            self.winner[code] = winner
+            self.terminal[code] = winner is not None or not empties
+            self.moves[code] = tuple(divmod(k, 3) for k in empties)
+            by_empties[len(empties)].append(code)
+
+        for codes in by_empties:
+            for code in codes:
+                if self.terminal[code]:
+                    result = self.winner[code] or 0
+                    self.value[1][code] = self.value[-1][code] = result
+                    continue
+                for player in (1, -1):
+                    digit = TTT_DIGITS[player]
+                    opponent_values = self.value[-player]
+                    self.value[player][code] = max(
+                        player * opponent_values[code + digit * TTT_POWERS[3 * i + j]]
+                        for i, j in self.moves[code]
+                    ) * player
+
+    def state_value(self, state):
+        return self.value[state.player][state.code]
+
+    def best_moves(self, state):
+        """All moves that keep the perfect-play result for the player to move."""
+        target = self.state_value(state)
+        digit = TTT_DIGITS[state.player]
+        opponent_values = self.value[-state.player]
+        return [(i, j) for i, j in self.moves[state.code]
+                if opponent_values[state.code + digit * TTT_POWERS[3 * i + j]] == target]
+
+
+_TTT_TABLE = None
+
+
+def tictactoe_table():
+    """The shared TicTacToeTable, built on first use."""
+    global _TTT_TABLE
+    if _TTT_TABLE is None:
+        _TTT_TABLE = TicTacToeTable()
+    return _TTT_TABLE
+
 # --- Evaluation Functions for Tic Tac Toe ---
 
 def ttt_simple_count_heuristic(state, player):
@@ -74,13 +287,35 @@ def line_score(line, player):
 # Checkers
 # -------------------
 
+def checkers_move_stages(moves):
+    """Split a checkers move list into captures and quiet moves, keeping its order."""
+    captures = [move for move in moves if abs(move[1][0] - move[0][0]) == 2]
+    if not captures:
+        return [], moves
+    return captures, [move for move in moves if abs(move[1][0] - move[0][0]) == 1]
+
+
 class CheckersState:
-    def __init__(self, board=None, player=1):
+    __slots__ = ("board", "player", "zobrist", "counts", "undo_stack", "_moves")
+
+    def __init__(self, board=None, player=1, zobrist=None, counts=None):
         if board is None:
             self.board = self.initial_board()
         else:
             self.board = board
         self.player = player
+        if zobrist is None:
+            zobrist = zobrist_hash(self.board, player, CHECKERS_ZOBRIST)
+        self.zobrist = zobrist
+        # Running (white, black, white kings, black kings), kept up to date
+        # by make_move so count_pieces never scans the board
+        if counts is None:
+            counts = self.tally_pieces()
+        self.counts = counts
+        self.undo_stack = []
+        # Legal moves, computed on first use; make_move clears them and
+        # unmake_move restores the parent's
+        self._moves = None
 
     def initial_board(self):
         b = np.zeros((8,8), dtype=int)
@@ -95,6 +330,12 @@ class CheckersState:
         return b
 
     def get_legal_moves(self):
+        """Legal moves, computed once per position; callers must not mutate the list."""
+        if self._moves is None:
+            self._moves = self.generate_moves()
+        return self._moves
+
+    def generate_moves(self):
         moves = []
         dirs = [(-1, -1), (-1, 1)] if self.player == 1 else [(1, -1), (1, 1)]
         for i in range(8):
@@ -110,15 +351,78 @@ class CheckersState:
                                 moves.append(((i,j),(ni2,nj2)))
         return moves
 
+    def iter_move_stages(self):
+        """Captures, then quiet moves. Both come out of one pass over the
+        pieces, which is cheaper here than a pass per stage."""
+        return iter(checkers_move_stages(self.get_legal_moves()))
+
+    def is_legal_move(self, move):
+        return move in self.get_legal_moves()
+
+    def copy(self):
+        return CheckersState(self.board.copy(), self.player, self.zobrist, self.counts)
+
+    def pack(self):
+        cells = self.board.reshape(64)[CHECKERS_FLAT_INDEX]
+        packed = CHECKERS_SIDE_BIT if self.player == -1 else 0
+        for k, piece in enumerate(CHECKERS_PIECES):
+            packed |= bits_from_cells(cells == piece) << (32 * k)
+        return packed
+
+    @classmethod
+    def from_packed(cls, packed):
+        bitboards = BitboardCheckersState.from_packed(packed)
+        return cls(bitboards.board, bitboards.player)
+
+    def __eq__(self, other):
+        if not isinstance(other, CheckersState):
+            return NotImplemented
+        return (self.zobrist == other.zobrist and self.player == other.player
+                and np.array_equal(self.board, other.board))
+
+    def __hash__(self):
+        return self.zobrist
+
     def apply_move(self, move):
+        child = self.copy()
+        child.make_move(move)
+        child.undo_stack.pop()  # the child starts with a fresh history
+        return child
+
+    def make_move(self, move):
+        """Play `move` in place, pushing an undo record for unmake_move."""
         (i1,j1),(i2,j2)=move
-        new_board = self.board.copy()
-        new_board[i2,j2]=new_board[i1,j1]
-        new_board[i1,j1]=0
+        board = self.board
+        piece = int(board[i1,j1])
+        captured = 0
+        zobrist = self.zobrist ^ ZOBRIST_SIDE
+        if piece != 0:
+            keys = CHECKERS_ZOBRIST[piece]
+            zobrist ^= keys[i1 * 8 + j1] ^ keys[i2 * 8 + j2]
+        board[i2,j2]=piece
+        board[i1,j1]=0
         if abs(i2 - i1)==2:
             mi, mj = (i1 + i2)//2, (j1 + j2)//2
-            new_board[mi,mj]=0
-        return CheckersState(new_board,-self.player)
+            captured = int(board[mi,mj])
+            board[mi,mj]=0
+        self.undo_stack.append((move, piece, captured, self.zobrist, self.counts, self._moves))
+        if captured != 0:
+            zobrist ^= CHECKERS_ZOBRIST[captured][mi * 8 + mj]
+            counts = list(self.counts)
+            counts[CHECKERS_PIECES.index(captured)] -= 1
+            self.counts = tuple(counts)
+        self.zobrist = zobrist
+        self.player = -self.player
+        self._moves = None
+
+    def unmake_move(self):
+        (((i1,j1),(i2,j2)), piece, captured, self.zobrist,
+         self.counts, self._moves) = self.undo_stack.pop()
+        self.board[i1,j1]=piece
+        self.board[i2,j2]=0
+        if abs(i2 - i1)==2:
+            self.board[(i1 + i2)//2, (j1 + j2)//2]=captured
+        self.player = -self.player
 
     def is_terminal(self):
         return len(self.get_legal_moves())==0
@@ -128,12 +432,20 @@ class CheckersState:
             return -self.player
         return None
 
+    def move_priority(self, move):
+        """Static ordering hint for search: captures before quiet moves."""
+        return 1 if abs(move[1][0] - move[0][0]) == 2 else 0
+
     def print_board(self):
         symbols={1:"r",-1:"b",0:"."}
         for row in self.board:
             print(" ".join(symbols[x] for x in row))
         print()
     def count_pieces(self):
+        return self.counts
+
+    def tally_pieces(self):
+        """Count (white, black, white kings, black kings) by scanning the board."""
         white = black = white_kings = black_kings = 0
         for row in self.board:
             for piece in row:
@@ -147,6 +459,251 @@ class CheckersState:
                     black_kings += 1
         return white, black, white_kings, black_kings
 
+# -------------------
+# Checkers (bitboard)
+# -------------------
+
+# The 32 playable dark squares are numbered row by row: square s sits at
+# row s // 4, and (i, j) maps to i * 4 + j // 2.
+CHECKERS_SQUARES = [(i, j) for i in range(8) for j in range(8) if (i + j) % 2 == 1]
+CHECKERS_SQUARE_INDEX = {sq: s for s, sq in enumerate(CHECKERS_SQUARES)}
+CHECKERS_FLAT_INDEX = np.array([i * 8 + j for i, j in CHECKERS_SQUARES])
+
+
+def build_checkers_tables():
+    """Per player and square: one (step, jump) entry per forward direction.
+
+    `step` is (target_bit, move) or None; `jump` is (over_bit, land_bit,
+    move) or None. Directions are listed in CheckersState's scan order so the
+    generated move lists come out identical.
+    """
+    dirs = {1: [(-1, -1), (-1, 1)], -1: [(1, -1), (1, 1)]}
+    tables = {}
+    for player, player_dirs in dirs.items():
+        table = []
+        for i, j in CHECKERS_SQUARES:
+            entries = []
+            for di, dj in player_dirs:
+                ni, nj = i + di, j + dj
+                if not (0 <= ni < 8 and 0 <= nj < 8):
+                    continue
+                step = (1 << CHECKERS_SQUARE_INDEX[(ni, nj)], ((i, j), (ni, nj)))
+                jump = None
+                ni2, nj2 = i + 2 * di, j + 2 * dj
+                if 0 <= ni2 < 8 and 0 <= nj2 < 8:
+                    jump = (1 << CHECKERS_SQUARE_INDEX[(ni, nj)],
+                            1 << CHECKERS_SQUARE_INDEX[(ni2, nj2)],
+                            ((i, j), (ni2, nj2)))
+                entries.append((step, jump))
+            table.append(tuple(entries))
+        tables[player] = tuple(table)
+    return tables
+
+
+CHECKERS_MOVE_TABLES = build_checkers_tables()
+CHECKERS_PIECES = (1, -1, 2, -2)  # board values of the four masks, in order
+CHECKERS_START_WHITE = sum(1 << s for s in range(20, 32))  # rows 5-7
+CHECKERS_START_BLACK = sum(1 << s for s in range(12))      # rows 0-2
+
+
+def squares32_to_array(bits):
+    """0/1 array of shape (32,) with entry s set when bit s is set."""
+    raw = np.frombuffer(bits.to_bytes(4, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little").astype(int)
+
+
+class BitboardCheckersState:
+    """Checkers state held as four 32-bit masks over the dark squares.
+
+    Men and kings are tracked per side, and moves come from tables built once
+    at import, so move lists, captures and winners are identical to
+    CheckersState. As there, men never promote and only men move or get
+    captured; kings can only appear when converting an existing board.
+    `board` is materialised as a NumPy array only when it is asked for.
+    """
+
+    __slots__ = ("white_men", "black_men", "white_kings", "black_kings", "player", "zobrist",
+                 "_board", "_moves", "undo_stack")
+
+    def __init__(self, board=None, player=1):
+        if board is None:
+            self.white_men = CHECKERS_START_WHITE
+            self.black_men = CHECKERS_START_BLACK
+            self.white_kings = 0
+            self.black_kings = 0
+        else:
+            cells = np.asarray(board).reshape(64)[CHECKERS_FLAT_INDEX]
+            self.white_men = sum(1 << s for s in range(32) if cells[s] == 1)
+            self.black_men = sum(1 << s for s in range(32) if cells[s] == -1)
+            self.white_kings = sum(1 << s for s in range(32) if cells[s] == 2)
+            self.black_kings = sum(1 << s for s in range(32) if cells[s] == -2)
+        self.player = player
+        self.zobrist = self.full_zobrist()
+        self._board = None
+        self._moves = None
+        self.undo_stack = []
+
+    @classmethod
+    def from_bitboards(cls, white_men, black_men, white_kings, black_kings, player, zobrist=None):
+        state = cls.__new__(cls)
+        state.white_men = white_men
+        state.black_men = black_men
+        state.white_kings = white_kings
+        state.black_kings = black_kings
+        state.player = player
+        state.zobrist = state.full_zobrist() if zobrist is None else zobrist
+        state._board = None
+        state._moves = None
+        state.undo_stack = []
+        return state
+
+    def full_zobrist(self):
+        h = ZOBRIST_SIDE if self.player == -1 else 0
+        for piece, bits in ((1, self.white_men), (-1, self.black_men),
+                            (2, self.white_kings), (-2, self.black_kings)):
+            keys = CHECKERS_ZOBRIST[piece]
+            while bits:
+                low = bits & -bits
+                h ^= keys[CHECKERS_FLAT_INDEX[low.bit_length() - 1]]
+                bits ^= low
+        return h
+
+    @property
+    def board(self):
+        if self._board is None:
+            cells = (squares32_to_array(self.white_men) - squares32_to_array(self.black_men)
+                     + 2 * squares32_to_array(self.white_kings)
+                     - 2 * squares32_to_array(self.black_kings))
+            b = np.zeros(64, dtype=int)
+            b[CHECKERS_FLAT_INDEX] = cells
+            self._board = b.reshape(8, 8)
+        return self._board
+
+    def occupied(self):
+        return self.white_men | self.black_men | self.white_kings | self.black_kings
+
+    def get_legal_moves(self):
+        """Legal moves, computed once per position; callers must not mutate the list."""
+        if self._moves is None:
+            self._moves = self.generate_moves()
+        return self._moves
+
+    def generate_moves(self):
+        if self.player == 1:
+            men, opp_men = self.white_men, self.black_men
+        else:
+            men, opp_men = self.black_men, self.white_men
+        occupied = self.occupied()
+        table = CHECKERS_MOVE_TABLES[self.player]
+        moves = []
+        while men:
+            low = men & -men
+            for step, jump in table[low.bit_length() - 1]:
+                if not step[0] & occupied:
+                    moves.append(step[1])
+                if jump is not None and jump[0] & opp_men and not jump[1] & occupied:
+                    moves.append(jump[2])
+            men ^= low
+        return moves
+
+    def iter_move_stages(self):
+        """Captures, then quiet moves. Both come out of one pass over the
+        pieces, which is cheaper here than a pass per stage."""
+        return iter(checkers_move_stages(self.get_legal_moves()))
+
+    def is_legal_move(self, move):
+        return move in self.get_legal_moves()
+
+    def copy(self):
+        return BitboardCheckersState.from_bitboards(
+            self.white_men, self.black_men, self.white_kings, self.black_kings,
+            self.player, self.zobrist)
+
+    def pack(self):
+        packed = (self.white_men | self.black_men << 32
+                  | self.white_kings << 64 | self.black_kings << 96)
+        return packed | CHECKERS_SIDE_BIT if self.player == -1 else packed
+
+    @classmethod
+    def from_packed(cls, packed):
+        mask = 0xFFFFFFFF
+        return cls.from_bitboards(packed & mask, (packed >> 32) & mask, (packed >> 64) & mask,
+                                  (packed >> 96) & mask, -1 if packed & CHECKERS_SIDE_BIT else 1)
+
+    def __eq__(self, other):
+        if not isinstance(other, BitboardCheckersState):
+            return NotImplemented
+        return (self.white_men == other.white_men and self.black_men == other.black_men
+                and self.white_kings == other.white_kings
+                and self.black_kings == other.black_kings and self.player == other.player)
+
+    def __hash__(self):
+        return self.zobrist
+
+    def apply_move(self, move):
+        white_men, black_men, white_kings, black_kings, zobrist = self.moved_masks(move)
+        return BitboardCheckersState.from_bitboards(white_men, black_men, white_kings,
+                                                    black_kings, -self.player, zobrist)
+
+    def make_move(self, move):
+        """Play `move` in place, pushing an undo record for unmake_move."""
+        self.undo_stack.append((self.white_men, self.black_men, self.white_kings,
+                                self.black_kings, self.zobrist, self._board, self._moves))
+        (self.white_men, self.black_men, self.white_kings, self.black_kings,
+         self.zobrist) = self.moved_masks(move)
+        self.player = -self.player
+        self._board = None
+        self._moves = None
+
+    def unmake_move(self):
+        (self.white_men, self.black_men, self.white_kings, self.black_kings,
+         self.zobrist, self._board, self._moves) = self.undo_stack.pop()
+        self.player = -self.player
+
+    def moved_masks(self, move):
+        """The four piece masks and the zobrist key after `move`."""
+        src, dst = move
+        src_bit = 1 << CHECKERS_SQUARE_INDEX[src]
+        dst_bit = 1 << CHECKERS_SQUARE_INDEX[dst]
+        masks = [self.white_men, self.black_men, self.white_kings, self.black_kings]
+        zobrist = self.zobrist ^ ZOBRIST_SIDE
+        for k in range(4):
+            if masks[k] & src_bit:
+                masks[k] ^= src_bit | dst_bit
+                keys = CHECKERS_ZOBRIST[CHECKERS_PIECES[k]]
+                zobrist ^= keys[src[0] * 8 + src[1]] ^ keys[dst[0] * 8 + dst[1]]
+                break
+        if abs(dst[0] - src[0]) == 2:
+            mid = ((src[0] + dst[0]) // 2, (src[1] + dst[1]) // 2)
+            mid_bit = 1 << CHECKERS_SQUARE_INDEX[mid]
+            for k in range(4):
+                if masks[k] & mid_bit:
+                    masks[k] ^= mid_bit
+                    zobrist ^= CHECKERS_ZOBRIST[CHECKERS_PIECES[k]][mid[0] * 8 + mid[1]]
+        return masks[0], masks[1], masks[2], masks[3], zobrist
+
+    def is_terminal(self):
+        return len(self.get_legal_moves()) == 0
+
+    def get_winner(self):
+        if self.is_terminal():
+            return -self.player
+        return None
+
+    def move_priority(self, move):
+        """Static ordering hint for search: captures before quiet moves."""
+        return 1 if abs(move[1][0] - move[0][0]) == 2 else 0
+
+    def print_board(self):
+        symbols = {1: "r", -1: "b", 0: "."}
+        for row in self.board:
+            print(" ".join(symbols[x] for x in row))
+        print()
+
+    def count_pieces(self):
+        return (self.white_men.bit_count(), self.black_men.bit_count(),
+                self.white_kings.bit_count(), self.black_kings.bit_count())
+
 # --- Evaluation Functions for Checkers ---
 
 def checkers_simple_heuristic(state, player):
@@ -170,14 +727,69 @@ def checkers_positional_heuristic(state, player):
 # Reversi
 # -------------------
 
+# Static move-ordering classes: corners 4, edges 3, interior 2, C-squares
+# (edge squares touching a corner) 1 and X-squares (diagonal to a corner) 0
+REVERSI_MOVE_PRIORITY = [
+    [4, 1, 3, 3, 3, 3, 1, 4],
+    [1, 0, 2, 2, 2, 2, 0, 1],
+    [3, 2, 2, 2, 2, 2, 2, 3],
+    [3, 2, 2, 2, 2, 2, 2, 3],
+    [3, 2, 2, 2, 2, 2, 2, 3],
+    [3, 2, 2, 2, 2, 2, 2, 3],
+    [1, 0, 2, 2, 2, 2, 0, 1],
+    [4, 1, 3, 3, 3, 3, 1, 4],
+]
+
+REVERSI_CORNERS = ((0, 0), (0, 7), (7, 0), (7, 7))
+
+# A player with no disc to place but whose opponent can still move must
+# pass; get_legal_moves then returns [REVERSI_PASS] as the only move. The
+# game ends when neither side can place a disc.
+REVERSI_PASS = "pass"
+
+# The squares of each move-priority class, best class first, row-major within
+# a class: the stages of iter_move_stages, which adds a last stage for a pass
+REVERSI_STAGE_SQUARES = tuple(
+    tuple((i, j) for i in range(8) for j in range(8) if REVERSI_MOVE_PRIORITY[i][j] == p)
+    for p in (4, 3, 2, 1, 0)
+)
+
+
+def reversi_mobility(state):
+    """Number of squares the side to move can play, not counting a pass."""
+    moves = state.get_legal_moves()
+    return 0 if moves == [REVERSI_PASS] else len(moves)
+
+
 class ReversiState:
+    __slots__ = ("board", "player", "zobrist", "counts", "corners", "undo_stack",
+                 "_moves", "_stages", "_flips", "_terminal")
 
-    def __init__(self, board=None, player=1):
+    def __init__(self, board=None, player=1, zobrist=None, counts=None, corners=None):
         if board is None:
             self.board = self.initial_board()
         else:
             self.board = board
         self.player = player
+        if zobrist is None:
+            zobrist = zobrist_hash(self.board, player, REVERSI_ZOBRIST)
+        self.zobrist = zobrist
+        # Running (white, black) disc and corner counts, kept up to date by
+        # make_move so evaluation never scans the board
+        if counts is None:
+            counts = self.tally_discs()
+        if corners is None:
+            corners = self.tally_corners()
+        self.counts = counts
+        self.corners = corners
+        self.undo_stack = []
+        # Derived properties, computed on first use; make_move clears them
+        # and unmake_move restores the parent's. _flips keeps the discs each
+        # square flips once move generation has worked them out
+        self._moves = None
+        self._stages = None
+        self._flips = {}
+        self._terminal = None
 
     def initial_board(self):
         b = np.zeros((8, 8), dtype=int)
@@ -186,26 +798,59 @@ class ReversiState:
         return b
 
     def get_legal_moves(self):
-        moves = []
-        for i in range(8):
-            for j in range(8):
-                if self.board[i, j] == 0 and self.has_flippable(i, j):
-                    moves.append((i, j))
-        return moves
+        """Legal moves, computed once per position; callers must not mutate the list."""
+        if self._moves is None:
+            # Row-major order, as the position cache indexes moves by it
+            self._moves = sorted(move for stage in self.iter_move_stages() for move in stage)
+        return self._moves
+
+    def iter_move_stages(self):
+        """Corners, edges, interior, C-squares, X-squares, then a pass; see cached_stages."""
+        return cached_stages(self, len(REVERSI_STAGE_SQUARES) + 1)
+
+    def generate_stage(self, k):
+        if k == len(REVERSI_STAGE_SQUARES):
+            # Reached only when every square stage came up empty
+            if any(self._stages) or not self.has_legal_move(-self.player):
+                return []
+            return [REVERSI_PASS]
+        return [(i, j) for i, j in REVERSI_STAGE_SQUARES[k]
+                if self.board[i, j] == 0 and self.square_flips((i, j))]
 
-    def has_flippable(self, i, j):
-        return len(self.flipped_discs(i, j)) > 0
+    def is_legal_move(self, move):
+        if move == REVERSI_PASS:
+            return self.get_legal_moves() == [REVERSI_PASS]
+        return self.board[move] == 0 and len(self.square_flips(move)) > 0
 
-    def flipped_discs(self, i, j):
+    def square_flips(self, move):
+        """flipped_discs for the side to move, kept for the squares that flip something."""
+        flips = self._flips.get(move)
+        if flips is None:
+            flips = self.flipped_discs(*move)
+            if flips:
+                self._flips[move] = flips
+        return flips
+
+    def has_legal_move(self, player):
+        return any(self.board[i, j] == 0 and self.has_flippable(i, j, player)
+                   for i in range(8) for j in range(8))
+
+    def has_flippable(self, i, j, player=None):
+        return len(self.flipped_discs(i, j, player)) > 0
+
+    def flipped_discs(self, i, j, player=None):
+        """Discs flipped by `player` (default: the side to move) playing at (i, j)."""
+        if player is None:
+            player = self.player
         flips = []
         dirs = [(dx, dy) for dx in [-1, 0, 1] for dy in [-1, 0, 1] if not (dx == 0 and dy == 0)]
         for dx, dy in dirs:
             temp = []
             x, y = i + dx, j + dy
             while 0 <= x < 8 and 0 <= y < 8:
-                if self.board[x, y] == -self.player:
+                if self.board[x, y] == -player:
                     temp.append((x, y))
-                elif self.board[x, y] == self.player:
+                elif self.board[x, y] == player:
                     flips.extend(temp)
                     break
                 else:
@@ -214,30 +859,125 @@ class ReversiState:
                 y += dy
         return flips
 
+    def copy(self):
+        return ReversiState(self.board.copy(), self.player, self.zobrist,
+                            self.counts, self.corners)
+
+    def pack(self):
+        flat = self.board.reshape(64)
+        packed = bits_from_cells(flat == 1) | bits_from_cells(flat == -1) << 64
+        return packed | REVERSI_SIDE_BIT if self.player == -1 else packed
+
+    @classmethod
+    def from_packed(cls, packed):
+        bitboards = BitboardReversiState.from_packed(packed)
+        return cls(bitboards.board, bitboards.player)
+
+    def __eq__(self, other):
+        if not isinstance(other, ReversiState):
+            return NotImplemented
+        return (self.zobrist == other.zobrist and self.player == other.player
+                and np.array_equal(self.board, other.board))
+
+    def __hash__(self):
+        return self.zobrist
+
     def apply_move(self, move):
+        child = self.copy()
+        child._flips = self._flips  # same position, so the flips found so far still hold
+        child.make_move(move)
+        child.undo_stack.pop()  # the child starts with a fresh history
+        return child
+
+    def make_move(self, move):
+        """Play `move` in place, pushing an undo record for unmake_move."""
+        flips = [] if move == REVERSI_PASS else self.square_flips(move)
+        self.undo_stack.append((move, flips, self.zobrist, self.counts, self.corners,
+                                self._moves, self._stages, self._flips, self._terminal))
+        self._moves = None
+        self._stages = None
+        self._flips = {}
+        self._terminal = None
+        if move == REVERSI_PASS:
+            self.zobrist ^= ZOBRIST_SIDE
+            self.player = -self.player
+            return
         i, j = move
-        new_board = self.board.copy()
-        new_board[i, j] = self.player
-        for x, y in self.flipped_discs(i, j):
-            new_board[x, y] = self.player
-        return ReversiState(new_board, -self.player)
+        self.board[i, j] = self.player
+        zobrist = self.zobrist ^ ZOBRIST_SIDE ^ REVERSI_ZOBRIST[self.player][i * 8 + j]
+        for x, y in flips:
+            self.board[x, y] = self.player
+            zobrist ^= REVERSI_FLIP_ZOBRIST[x * 8 + y]
+        # A corner disc can never be flipped, so only the placed disc moves
+        # the corner counts
+        white, black = self.counts
+        white_corners, black_corners = self.corners
+        is_corner = move in REVERSI_CORNERS
+        if self.player == 1:
+            self.counts = (white + 1 + len(flips), black - len(flips))
+            if is_corner:
+                self.corners = (white_corners + 1, black_corners)
+        else:
+            self.counts = (white - len(flips), black + 1 + len(flips))
+            if is_corner:
+                self.corners = (white_corners, black_corners + 1)
+        self.zobrist = zobrist
+        self.player = -self.player
+
+    def unmake_move(self):
+        (move, flips, self.zobrist, self.counts, self.corners,
+         self._moves, self._stages, self._flips, self._terminal) = self.undo_stack.pop()
+        if move != REVERSI_PASS:
+            self.board[move] = 0
+            for x, y in flips:
+                self.board[x, y] = self.player  # back to the side that now moves next
+        self.player = -self.player
 
     def is_terminal(self):
-        return len(self.get_legal_moves()) == 0 and \
-               len(ReversiState(self.board, -self.player).get_legal_moves()) == 0
+        # The stages end with a pass when only the opponent can move
+        if self._terminal is None:
+            self._terminal = not any(self.iter_move_stages())
+        return self._terminal
 
     def get_winner(self):
         if not self.is_terminal():
             return None
-        count = np.sum(self.board)
-        if count > 0:
+        white, black = self.count_discs()
+        if white > black:
             return 1
-        elif count < 0:
+        elif white < black:
             return -1
         else:
             return 0
 
+    def sides(self, player=None):
+        """(own, opp) 64-bit bitboards for `player` (default: the side to move),
+        square (i, j) at bit i * 8 + j."""
+        if player is None:
+            player = self.player
+        flat = self.board.reshape(64)
+        own = sum(1 << int(k) for k in np.flatnonzero(flat == player))
+        opp = sum(1 << int(k) for k in np.flatnonzero(flat == -player))
+        return own, opp
+
     def count_discs(self):
+        return self.counts
+
+    def count_corners(self):
+        return self.corners
+
+    def corner_ownership(self, player):
+        """Corners held by `player` minus corners held by the opponent."""
+        white, black = self.corners
+        return white - black if player == 1 else black - white
+
+    def tally_corners(self):
+        white = sum(1 for i, j in REVERSI_CORNERS if self.board[i, j] == 1)
+        black = sum(1 for i, j in REVERSI_CORNERS if self.board[i, j] == -1)
+        return white, black
+
+    def tally_discs(self):
+        """Count (white, black) discs by scanning the board."""
         white = 0
         black = 0
         for row in self.board:
@@ -248,26 +988,404 @@ class ReversiState:
                     black += 1
         return white, black
 
+    def move_priority(self, move):
+        """Static ordering hint for search: corners first, X-squares last."""
+        if move == REVERSI_PASS:
+            return 0  # a pass is always the only legal move
+        return REVERSI_MOVE_PRIORITY[move[0]][move[1]]
+
     def print_board(self):
         symbols = {1: "X", -1: "O", 0: "."}
         for row in self.board:
             print(" ".join(symbols[x] for x in row))
         print()
 
+# -------------------
+# Reversi (bitboard)
+# -------------------
+
+# Square (i, j) is bit i * 8 + j. Shifting by 1 moves along a row and by 8
+# along a column; the file masks drop discs that would wrap round an edge.
+FULL_MASK = 0xFFFFFFFFFFFFFFFF
+NOT_A_FILE = 0xFEFEFEFEFEFEFEFE  # column 0 cleared
+NOT_H_FILE = 0x7F7F7F7F7F7F7F7F  # column 7 cleared
+
+# (shift, mask) pairs for the four directions that lower the bit index and
+# the four that raise it.
+REVERSI_RIGHT_SHIFTS = ((9, NOT_H_FILE), (8, FULL_MASK), (7, NOT_A_FILE), (1, NOT_H_FILE))
+REVERSI_LEFT_SHIFTS = ((1, NOT_A_FILE), (7, NOT_H_FILE), (8, FULL_MASK), (9, NOT_A_FILE))
+
+REVERSI_START_WHITE = (1 << 28) | (1 << 35)  # (3, 4) and (4, 3)
+REVERSI_START_BLACK = (1 << 27) | (1 << 36)  # (3, 3) and (4, 4)
+REVERSI_CORNER_MASK = (1 << 0) | (1 << 7) | (1 << 56) | (1 << 63)
+REVERSI_STAGE_MASKS = tuple(sum(1 << (i * 8 + j) for i, j in squares)
+                            for squares in REVERSI_STAGE_SQUARES)
+
+
+def reversi_move_mask(own, opp):
+    """Bitmask of the empty squares where `own` flips at least one disc."""
+    empty = ~(own | opp) & FULL_MASK
+    moves = 0
+    for n, mask in REVERSI_RIGHT_SHIFTS:
+        o = opp & mask
+        x = (own >> n) & o
+        x |= (x >> n) & o
+        x |= (x >> n) & o
+        x |= (x >> n) & o
+        x |= (x >> n) & o
+        x |= (x >> n) & o
+        moves |= (x >> n) & mask
+    for n, mask in REVERSI_LEFT_SHIFTS:
+        o = opp & mask
+        x = (own << n) & o
+        x |= (x << n) & o
+        x |= (x << n) & o
+        x |= (x << n) & o
+        x |= (x << n) & o
+        x |= (x << n) & o
+        moves |= (x << n) & mask
+    return moves & empty
+
+
+def reversi_flip_mask(own, opp, move_bit):
+    """Bitmask of the opponent discs flipped by playing `move_bit`."""
+    flips = 0
+    for n, mask in REVERSI_RIGHT_SHIFTS:
+        f = 0
+        x = (move_bit >> n) & mask
+        while x & opp:
+            f |= x
+            x = (x >> n) & mask
+        if x & own:
+            flips |= f
+    for n, mask in REVERSI_LEFT_SHIFTS:
+        f = 0
+        x = (move_bit << n) & mask
+        while x & opp:
+            f |= x
+            x = (x << n) & mask
+        if x & own:
+            flips |= f
+    return flips
+
+
+def bitboard_squares(bits):
+    """List the (i, j) squares set in `bits`, in row-major order."""
+    squares = []
+    while bits:
+        low = bits & -bits
+        squares.append(divmod(low.bit_length() - 1, 8))
+        bits ^= low
+    return squares
+
+
+def bitboard_to_array(bits):
+    """0/1 array of shape (64,) with entry k set when bit k is set."""
+    raw = np.frombuffer(bits.to_bytes(8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little").astype(int)
+
+
+class BitboardReversiState:
+    """Reversi state held as two 64-bit integers, one per player.
+
+    Drop-in replacement for ReversiState: it generates the same moves in the
+    same order and reports the same winner, but builds moves and flips from
+    whole-board shifts instead of walking each direction square by square.
+    `board` is materialised as a NumPy array only when a heuristic or
+    print_board asks for it.
+    """
+
+    __slots__ = ("white", "black", "player", "zobrist", "_board", "_moves", "_move_mask",
+                 "_stages", "_terminal", "undo_stack")
+
+    def __init__(self, board=None, player=1):
+        if board is None:
+            self.white = REVERSI_START_WHITE
+            self.black = REVERSI_START_BLACK
+        else:
+            flat = np.asarray(board).reshape(64)
+            self.white = sum(1 << k for k in range(64) if flat[k] == 1)
+            self.black = sum(1 << k for k in range(64) if flat[k] == -1)
+        self.player = player
+        self.zobrist = self.full_zobrist()
+        self._board = None
+        self._moves = None
+        self._move_mask = None
+        self._stages = None
+        self._terminal = None
+        self.undo_stack = []
+
+    @classmethod
+    def from_bitboards(cls, white, black, player, zobrist=None):
+        state = cls.__new__(cls)
+        state.white = white
+        state.black = black
+        state.player = player
+        state.zobrist = state.full_zobrist() if zobrist is None else zobrist
+        state._board = None
+        state._moves = None
+        state._move_mask = None
+        state._stages = None
+        state._terminal = None
+        state.undo_stack = []
+        return state
+
+    def full_zobrist(self):
+        h = ZOBRIST_SIDE if self.player == -1 else 0
+        for piece, bits in ((1, self.white), (-1, self.black)):
+            keys = REVERSI_ZOBRIST[piece]
+            while bits:
+                low = bits & -bits
+                h ^= keys[low.bit_length() - 1]
+                bits ^= low
+        return h
+
+    @property
+    def board(self):
+        if self._board is None:
+            cells = bitboard_to_array(self.white) - bitboard_to_array(self.black)
+            self._board = cells.reshape(8, 8)
+        return self._board
+
+    def sides(self, player=None):
+        """(own, opp) bitboards from the point of view of `player` (default: the side to move)."""
+        if player is None:
+            player = self.player
+        if player == 1:
+            return self.white, self.black
+        return self.black, self.white
+
+    def get_legal_moves(self):
+        """Legal moves, computed once per position; callers must not mutate the list."""
+        if self._moves is None:
+            self._moves = bitboard_squares(self.move_mask())
+            if not self._moves and self.opponent_can_move():
+                self._moves = [REVERSI_PASS]
+        return self._moves
+
+    def move_mask(self):
+        """reversi_move_mask for the side to move, computed once per position."""
+        if self._move_mask is None:
+            own, opp = self.sides()
+            self._move_mask = reversi_move_mask(own, opp)
+        return self._move_mask
+
+    def opponent_can_move(self):
+        own, opp = self.sides()
+        return reversi_move_mask(opp, own) != 0
+
+    def iter_move_stages(self):
+        """Corners, edges, interior, C-squares, X-squares, then a pass; see cached_stages."""
+        return cached_stages(self, len(REVERSI_STAGE_MASKS) + 1)
+
+    def generate_stage(self, k):
+        if k < len(REVERSI_STAGE_MASKS):
+            return bitboard_squares(self.move_mask() & REVERSI_STAGE_MASKS[k])
+        if not self.move_mask() and self.opponent_can_move():
+            return [REVERSI_PASS]
+        return []
+
+    def is_legal_move(self, move):
+        if move == REVERSI_PASS:
+            return not self.move_mask() and self.opponent_can_move()
+        i, j = move
+        return (self.move_mask() >> (i * 8 + j)) & 1 == 1
+
+    def has_flippable(self, i, j, player=None):
+        own, opp = self.sides(player)
+        return reversi_flip_mask(own, opp, 1 << (i * 8 + j)) != 0
+
+    def flipped_discs(self, i, j, player=None):
+        """Discs flipped by `player` (default: the side to move) playing at (i, j)."""
+        own, opp = self.sides(player)
+        return bitboard_squares(reversi_flip_mask(own, opp, 1 << (i * 8 + j)))
+
+    def copy(self):
+        return BitboardReversiState.from_bitboards(self.white, self.black, self.player,
+                                                   self.zobrist)
+
+    def pack(self):
+        packed = self.white | self.black << 64
+        return packed | REVERSI_SIDE_BIT if self.player == -1 else packed
+
+    @classmethod
+    def from_packed(cls, packed):
+        return cls.from_bitboards(packed & FULL_MASK, (packed >> 64) & FULL_MASK,
+                                  -1 if packed & REVERSI_SIDE_BIT else 1)
+
+    def __eq__(self, other):
+        if not isinstance(other, BitboardReversiState):
+            return NotImplemented
+        return (self.white == other.white and self.black == other.black
+                and self.player == other.player)
+
+    def __hash__(self):
+        return self.zobrist
+
+    def apply_move(self, move):
+        white, black, zobrist = self.moved_bitboards(move)
+        return BitboardReversiState.from_bitboards(white, black, -self.player, zobrist)
+
+    def make_move(self, move):
+        """Play `move` in place, pushing an undo record for unmake_move."""
+        self.undo_stack.append((self.white, self.black, self.zobrist, self._board,
+                                self._moves, self._move_mask, self._stages, self._terminal))
+        self.white, self.black, self.zobrist = self.moved_bitboards(move)
+        self.player = -self.player
+        self._board = None
+        self._moves = None
+        self._move_mask = None
+        self._stages = None
+        self._terminal = None
+
+    def unmake_move(self):
+        (self.white, self.black, self.zobrist, self._board,
+         self._moves, self._move_mask, self._stages, self._terminal) = self.undo_stack.pop()
+        self.player = -self.player
+
+    def moved_bitboards(self, move):
+        """(white, black, zobrist) after `move`."""
+        if move == REVERSI_PASS:
+            return self.white, self.black, self.zobrist ^ ZOBRIST_SIDE
+        i, j = move
+        bit = 1 << (i * 8 + j)
+        own, opp = self.sides()
+        flips = reversi_flip_mask(own, opp, bit)
+        zobrist = self.zobrist ^ ZOBRIST_SIDE ^ REVERSI_ZOBRIST[self.player][i * 8 + j]
+        bits = flips
+        while bits:
+            low = bits & -bits
+            zobrist ^= REVERSI_FLIP_ZOBRIST[low.bit_length() - 1]
+            bits ^= low
+        own |= bit | flips
+        opp ^= flips
+        if self.player == 1:
+            return own, opp, zobrist
+        return opp, own, zobrist
+
+    def is_terminal(self):
+        if self._terminal is None:
+            self._terminal = not self.move_mask() and not self.opponent_can_move()
+        return self._terminal
+
+    def get_winner(self):
+        if not self.is_terminal():
+            return None
+        white, black = self.count_discs()
+        if white > black:
+            return 1
+        elif white < black:
+            return -1
+        else:
+            return 0
+
+    def count_discs(self):
+        return self.white.bit_count(), self.black.bit_count()
+
+    def count_corners(self):
+        return ((self.white & REVERSI_CORNER_MASK).bit_count(),
+                (self.black & REVERSI_CORNER_MASK).bit_count())
+
+    def corner_ownership(self, player):
+        """Corners held by `player` minus corners held by the opponent."""
+        white, black = self.count_corners()
+        return white - black if player == 1 else black - white
+
+    def move_priority(self, move):
+        """Static ordering hint for search: corners first, X-squares last."""
+        if move == REVERSI_PASS:
+            return 0  # a pass is always the only legal move
+        return REVERSI_MOVE_PRIORITY[move[0]][move[1]]
+
+    def print_board(self):
+        symbols = {1: "X", -1: "O", 0: "."}
+        for row in self.board:
+            print(" ".join(symbols[x] for x in row))
+        print()
+
+# -------------------
+# Vectorized move masks
+# -------------------
+
+# The same move rules applied to a whole stack of boards at once, for batched
+# playouts (rollouts.py) and batched leaf evaluation (eval_batch below).
+
+def shift(a, di, dj):
+    """out[..., i, j] = a[..., i + di, j + dj], False/0 off the board."""
+    out = np.zeros_like(a)
+    rows, cols = a.shape[-2:]
+    src_i = slice(max(di, 0), rows + min(di, 0))
+    dst_i = slice(max(-di, 0), rows + min(-di, 0))
+    src_j = slice(max(dj, 0), cols + min(dj, 0))
+    dst_j = slice(max(-dj, 0), cols + min(-dj, 0))
+    out[..., dst_i, dst_j] = a[..., src_i, src_j]
+    return out
+
+
+def checkers_legal_masks(boards, player):
+    """(N, 8, 8, 2, 2) mask over (from row, from col, column step, jump)."""
+    di = -1 if player == 1 else 1
+    men = boards == player
+    empty = boards == 0
+    prey = boards == -player  # as in CheckersState, only men can be captured
+    legal = np.zeros(boards.shape + (2, 2), dtype=bool)
+    for d, dj in enumerate((-1, 1)):
+        legal[..., d, 0] = men & shift(empty, di, dj)
+        legal[..., d, 1] = men & shift(prey, di, dj) & shift(empty, 2 * di, 2 * dj)
+    return legal
+
+
+# Reversi boards are packed into uint64 vectors, one bitboard per colour per
+# board, and use the same masked shifts as BitboardReversiState.
+REVERSI_VECTOR_SHIFTS = (
+    [(np.uint64(n), np.uint64(mask), False) for n, mask in REVERSI_RIGHT_SHIFTS]
+    + [(np.uint64(n), np.uint64(mask), True) for n, mask in REVERSI_LEFT_SHIFTS]
+)
+
+
+def shift_bits(x, n, mask, left):
+    return ((x << n) if left else (x >> n)) & mask
+
+
+def bits_to_mask(bits):
+    """(N,) uint64 -> (N, 64) bool, column k for bit k."""
+    raw = bits.astype("<u8").view(np.uint8).reshape(len(bits), 8)
+    return np.unpackbits(raw, axis=1, bitorder="little").astype(bool)
+
+
+def mask_to_bits(mask):
+    """(N, 64) bool -> (N,) uint64."""
+    return np.packbits(mask, axis=1, bitorder="little").view("<u8").reshape(len(mask))
+
+
+def reversi_vector_moves(own, opp):
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for n, mask, left in REVERSI_VECTOR_SHIFTS:
+        o = opp & mask
+        x = shift_bits(own, n, o, left)
+        for _ in range(5):
+            x |= shift_bits(x, n, o, left)
+        moves |= shift_bits(x, n, mask, left)
+    return moves & empty
+
+
+def reversi_mobility_batch(boards, player):
+    """Number of legal moves for `player` on each board of an (N, 8, 8) stack."""
+    flat = boards.reshape(len(boards), 64)
+    moves = reversi_vector_moves(mask_to_bits(flat == player), mask_to_bits(flat == -player))
+    return bits_to_mask(moves).sum(axis=1)
+
 # --- Evaluation Functions for Reversi ---
 
 def reversi_simple_count(state, player):
-    return np.sum(state.board == player) - np.sum(state.board == -player)
+    white, black = state.count_discs()
+    return white - black if player == 1 else black - white
 
 def reversi_corner_mobility_heuristic(state, player):
     score = reversi_simple_count(state, player)
-    corners = [(0,0), (0,7), (7,0), (7,7)]
-    for i, j in corners:
-        if state.board[i,j] == player:
-            score += 10
-        elif state.board[i,j] == -player:
-            score -= 10
-    score += len(state.get_legal_moves())
+    score += 10 * state.corner_ownership(player)
+    score += reversi_mobility(state)
     return score
 # ---------------------------------------------
 # TICTACTOE Heuristics
@@ -310,6 +1428,15 @@ def tictactoe_refined_heuristic(state, player):
 
     return score
 
+def tictactoe_oracle_heuristic(state, player):
+    # Oracle: exact perfect-play result from the solved table
+    value = tictactoe_table().state_value(state)
+    if value == player:
+        return 10
+    elif value == -player:
+        return -10
+    return 0
+
 # ---------------------------------------------
 # CHECKERS Heuristics
 # ---------------------------------------------
@@ -344,15 +1471,52 @@ def reversi_refined_heuristic(state, player):
     else:
         disc_diff = black - white
 
-    corners = [(0,0), (0,7), (7,0), (7,7)]
-    board = state.board
-    corner_score = 0
-    for i, j in corners:
-        if board[i][j] == player:
-            corner_score += 5
-        elif board[i][j] == -player:
-            corner_score -= 5
+    corner_score = 5 * state.corner_ownership(player)
 
-    mobility = len(state.get_legal_moves())
+    mobility = reversi_mobility(state)
+    return disc_diff + corner_score + 0.1 * mobility
+
+# ---------------------------------------------
+# Batched heuristics
+# ---------------------------------------------
+# eval_batch(boards, player, to_move) scores a stack of (N, 8, 8) boards that
+# all have `to_move` as the side to move, returning the same values as the
+# scalar heuristic would for each board. MinimaxAgent uses it to score all
+# children of a node one ply above the horizon in one call; heuristics
+# without it are evaluated one state at a time.
+
+def checkers_piece_counts_batch(boards):
+    return [(boards == piece).sum(axis=(1, 2)) for piece in CHECKERS_PIECES]
+
+def checkers_simple_heuristic_batch(boards, player, to_move):
+    white, black, white_kings, black_kings = checkers_piece_counts_batch(boards)
+    if player == 1:
+        return white + 1.5 * white_kings - black - 1.5 * black_kings
+    else:
+        return black + 1.5 * black_kings - white - 1.5 * white_kings
+
+def checkers_refined_heuristic_batch(boards, player, to_move):
+    white, black, white_kings, black_kings = checkers_piece_counts_batch(boards)
+    if player == 1:
+        material = white + 2 * white_kings - black - 2 * black_kings
+    else:
+        material = black + 2 * black_kings - white - 2 * white_kings
+
+    mobility = checkers_legal_masks(boards, to_move).sum(axis=(1, 2, 3, 4))
+    return material + 0.1 * mobility
+
+def reversi_simple_heuristic_batch(boards, player, to_move):
+    return (boards == player).sum(axis=(1, 2)) - (boards == -player).sum(axis=(1, 2))
+
+def reversi_refined_heuristic_batch(boards, player, to_move):
+    disc_diff = reversi_simple_heuristic_batch(boards, player, to_move)
+    corners = boards[:, [0, 0, 7, 7], [0, 7, 0, 7]]
+    corner_score = 5 * ((corners == player).sum(axis=1) - (corners == -player).sum(axis=1))
+
+    mobility = reversi_mobility_batch(boards, to_move)
     return disc_diff + corner_score + 0.1 * mobility
 
+checkers_simple_heuristic.eval_batch = checkers_simple_heuristic_batch
+checkers_refined_heuristic.eval_batch = checkers_refined_heuristic_batch
+reversi_simple_heuristic.eval_batch = reversi_simple_heuristic_batch
+reversi_refined_heuristic.eval_batch = reversi_refined_heuristic_batch
@@ -0,0 +1,230 @@
+import random
+import numpy as np
+from problems import (
+    TicTacToeState,
+    CheckersState,
+    BitboardCheckersState,
+    ReversiState,
+    BitboardReversiState,
+    REVERSI_VECTOR_SHIFTS,
+    TTT_LINES,
+    bits_to_mask,
+    checkers_legal_masks,
+    mask_to_bits,
+    reversi_vector_moves,
+    shift_bits,
+)
+
+# ---------------------------------------------
+# Batched random playouts
+# ---------------------------------------------
+# Each engine plays N independent random games at once on a stacked board
+# array, one ply for every unfinished game per step. It takes the N start
+# boards, which may differ, and the player to move on all of them. Each
+# engine returns a
+# vector of winners (1, -1, or 0 for a draw) and a vector of game lengths in
+# plies. In Tic Tac Toe and Checkers all unfinished games have the same
+# player to move within a step; Reversi games can pass, so its engine keeps
+# the side to move per game.
+
+TTT_LINE_INDEX = np.array(TTT_LINES)
+
+
+def choose_random(legal, rng):
+    """Pick one True column uniformly per row of a 2-D mask (rows need one)."""
+    counts = legal.sum(axis=1)
+    picks = (rng.random(len(legal)) * counts).astype(np.int64)
+    return np.argmax(np.cumsum(legal, axis=1) > picks[:, None], axis=1)
+
+
+def make_rng(rng):
+    # Draw from the standard random module by default, so seeding it (as
+    # comparisons.play_game does) also fixes the batched playouts
+    if rng is None:
+        return np.random.default_rng(random.getrandbits(64))
+    return rng
+
+# --- Reversi ---
+# Reversi games are held as two uint64 vectors, the discs of the side to
+# move and of its opponent, plus the colour of the side to move per game; the
+# move and flip masks are those of problems.py, vectorized. A pass swaps the
+# two vectors and counts as a ply, as REVERSI_PASS does on the states.
+
+def reversi_vector_flips(own, opp, move):
+    flips = np.zeros_like(own)
+    for n, mask, left in REVERSI_VECTOR_SHIFTS:
+        x = shift_bits(move, n, mask, left)
+        run = np.zeros_like(own)
+        for _ in range(6):
+            on_opp = x & opp
+            run |= on_opp
+            # advance only while still walking over opponent discs
+            x = np.where(on_opp != 0, shift_bits(on_opp, n, mask, left), x)
+        flips |= np.where(x & own != 0, run, np.uint64(0))
+    return flips
+
+
+def reversi_playouts(boards, player, rng=None):
+    rng = make_rng(rng)
+    flat = np.asarray(boards).reshape(-1, 64)
+    n = len(flat)
+    own = mask_to_bits(flat == player)
+    opp = mask_to_bits(flat == -player)
+    to_move = np.full(n, player, dtype=np.int8)
+    winners = np.zeros(n, dtype=np.int8)
+    plies = np.zeros(n, dtype=np.int32)
+    active = np.arange(n)
+    ply = 0
+    while len(active):
+        moves = reversi_vector_moves(own, opp)
+        stuck = moves == 0
+        if stuck.any():
+            # A stuck player passes unless the opponent is stuck too, which
+            # ends the game
+            s_own, s_opp = own[stuck], opp[stuck]
+            over = reversi_vector_moves(s_opp, s_own) == 0
+            diff = bits_to_mask(s_own[over]).sum(axis=1) - bits_to_mask(s_opp[over]).sum(axis=1)
+            finished = active[stuck][over]
+            winners[finished] = to_move[stuck][over] * np.sign(diff)
+            plies[finished] = ply
+            keep = ~stuck
+            keep[np.flatnonzero(stuck)[~over]] = True
+            active, own, opp = active[keep], own[keep], opp[keep]
+            moves, to_move = moves[keep], to_move[keep]
+        playing = moves != 0
+        if playing.any():
+            p_own, p_opp, p_moves = own[playing], opp[playing], moves[playing]
+            squares = choose_random(bits_to_mask(p_moves), rng)
+            move = np.left_shift(np.uint64(1), squares.astype(np.uint64))
+            flips = reversi_vector_flips(p_own, p_opp, move)
+            own[playing] = p_own | move | flips
+            opp[playing] = p_opp ^ flips
+        # Every game, moved or passed, hands the turn to the other side
+        own, opp = opp, own
+        to_move = -to_move
+        ply += 1
+    return winners, plies
+
+# --- Checkers ---
+
+def checkers_apply(boards, moves, player):
+    n = np.arange(len(boards))
+    di = -1 if player == 1 else 1
+    square, d, jump = moves // 4, (moves // 2) % 2, moves % 2
+    r, c = square // 8, square % 8
+    dj = 2 * d - 1
+    step = 1 + jump
+    piece = boards[n, r, c]
+    boards[n, r, c] = 0
+    boards[n, r + step * di, c + step * dj] = piece
+    j = jump == 1
+    boards[n[j], r[j] + di, c[j] + dj[j]] = 0
+
+
+def checkers_playouts(boards, player, rng=None):
+    rng = make_rng(rng)
+    boards = np.array(boards, dtype=np.int8)
+    n = len(boards)
+    winners = np.zeros(n, dtype=np.int8)
+    plies = np.zeros(n, dtype=np.int32)
+    active = np.arange(n)
+    ply = 0
+    while len(active):
+        sub = boards[active]
+        legal = checkers_legal_masks(sub, player).reshape(len(sub), 256)
+        has_move = legal.any(axis=1)
+        winners[active[~has_move]] = -player  # a player with no moves loses
+        plies[active[~has_move]] = ply
+        active, sub, legal = active[has_move], sub[has_move], legal[has_move]
+        if len(active):
+            checkers_apply(sub, choose_random(legal, rng), player)
+            boards[active] = sub
+        player = -player
+        ply += 1
+    return winners, plies
+
+# --- Tic Tac Toe ---
+
+def tictactoe_line_winners(flat):
+    """Winner (1, -1 or 0) of each (N, 9) board, first completed line first."""
+    sums = flat[:, TTT_LINE_INDEX].sum(axis=2)
+    full = np.abs(sums) == 3
+    first = np.argmax(full, axis=1)
+    return np.where(full.any(axis=1), np.sign(sums[np.arange(len(flat)), first]), 0)
+
+
+def tictactoe_playouts(boards, player, rng=None):
+    rng = make_rng(rng)
+    flat = np.array(boards, dtype=np.int8).reshape(-1, 9)
+    n = len(flat)
+    winners = np.zeros(n, dtype=np.int8)
+    plies = np.zeros(n, dtype=np.int32)
+    active = np.arange(n)
+    ply = 0
+    while len(active):
+        sub = flat[active]
+        line_winners = tictactoe_line_winners(sub)
+        legal = sub == 0
+        over = (line_winners != 0) | ~legal.any(axis=1)
+        winners[active[over]] = line_winners[over]
+        plies[active[over]] = ply
+        active, sub, legal = active[~over], sub[~over], legal[~over]
+        if len(active):
+            sub[np.arange(len(sub)), choose_random(legal, rng)] = player
+            flat[active] = sub
+        player = -player
+        ply += 1
+    return winners, plies
+
+# ---------------------------------------------
+# Dispatch
+# ---------------------------------------------
+
+PLAYOUT_ENGINES = {
+    TicTacToeState: tictactoe_playouts,
+    CheckersState: checkers_playouts,
+    BitboardCheckersState: checkers_playouts,
+    ReversiState: reversi_playouts,
+    BitboardReversiState: reversi_playouts,
+}
+
+
+def random_playouts(state, n, rng=None, with_lengths=False):
+    """Winners of `n` random games played out from `state`, as an int8 vector.
+
+    With with_lengths, also return each game's length in plies.
+    """
+    engine = PLAYOUT_ENGINES[type(state)]
+    boards = np.repeat(np.asarray(state.board)[None], n, axis=0)
+    winners, plies = engine(boards, state.player, rng)
+    if with_lengths:
+        return winners, plies
+    return winners
+
+
+def random_playouts_batch(states, counts, rng=None, with_lengths=False):
+    """Winners of counts[k] random games from states[k], for every k.
+
+    States of the same class with the same player to move share one engine
+    call, so many small requests cost about as much as one large one.
+    Returns one int8 winner vector per state, in order, and with
+    with_lengths also one vector of game lengths per state.
+    """
+    groups = {}
+    for k, state in enumerate(states):
+        groups.setdefault((type(state), state.player), []).append(k)
+    results = [None] * len(states)
+    lengths = [None] * len(states)
+    for (state_class, player), members in groups.items():
+        boards = np.concatenate([
+            np.repeat(np.asarray(states[k].board)[None], counts[k], axis=0) for k in members
+        ])
+        winners, plies = PLAYOUT_ENGINES[state_class](boards, player, rng)
+        start = 0
+        for k in members:
+            results[k] = winners[start:start + counts[k]]
+            lengths[k] = plies[start:start + counts[k]]
+            start += counts[k]
+    if with_lengths:
+        return results, lengths
+    return results
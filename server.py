@@ -0,0 +1,539 @@
+import argparse
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from algorithms import MCTSAgent, MinimaxAgent
+from comparisons import GAMES, HEURISTICS, decode_move, get_agent, percentile
+from problems import (
+    BitboardCheckersState,
+    BitboardReversiState,
+    CheckersState,
+    ReversiState,
+    TicTacToeState,
+)
+from rollouts import random_playouts_batch
+
+# ---------------------------------------------
+# Protocol
+# ---------------------------------------------
+# One JSON object per line in each direction. Every request may carry an
+# "id", which its response echoes; responses on one connection come back in
+# the order they finish, not the order they were sent. Positions are sent as
+# "game" (a comparisons.GAMES name), "board" (nested lists) and "player".
+#
+#   {"op": "select_move", "game", "agent", "board", "player", "game_id"}
+#       -> {"move": ..., "stats": {...}}   agent as in comparisons.get_agent
+#       Requests with the same game_id (unique across clients, e.g. a UUID)
+#       are served by the same agent, so an MCTS tree carries over between
+#       the moves of a game. Without one, each request gets a fresh agent.
+#   {"op": "evaluate", "game", "heuristic", "board", "player", "perspective"}
+#       -> {"score": ...}   heuristic value for `perspective` (default: player)
+#   {"op": "playouts", "game", "board", "player", "n"}
+#       -> {"wins": {"1": ..., "-1": ..., "0": ...}}
+#   {"op": "stats"} -> queue depth, batch sizes and latency percentiles
+#
+# Moves travel as JSON arrays; decode_move turns them back into tuples.
+# Responses other than stats carry queue_ms and service_ms, and failed
+# requests an "error" string.
+
+DEFAULT_PORT = 8765
+
+
+def make_state(request):
+    GameClass = GAMES[request["game"]]
+    return GameClass(board=np.array(request["board"], dtype=int), player=int(request["player"]))
+
+
+def latency_percentiles(values):
+    if not values:
+        return None
+    return {"p50": percentile(values, 50) * 1000, "p95": percentile(values, 95) * 1000,
+            "max": max(values) * 1000}
+
+# ---------------------------------------------
+# Lockstep searches
+# ---------------------------------------------
+
+# Fewest pooled playouts of a state class worth one vectorized engine call;
+# below this, serial MCTSAgent.simulate playouts are faster. Measured on
+# random midgame positions: the NumPy states play serially slowly, while
+# the bitboard states only lose to the engine with large batches.
+MIN_VECTOR_PLAYOUTS = {
+    TicTacToeState: 8,
+    CheckersState: 8,
+    ReversiState: 8,
+    BitboardCheckersState: 64,
+    BitboardReversiState: 128,
+}
+
+
+class LockstepSearches:
+    """Runs several searches in turn and pools their leaf work.
+
+    Each search runs on its own thread, but only one runs at a time, so
+    agents that share tables need no locking. A search that needs playouts
+    or a frontier evaluation queues the work through playouts() or an
+    evaluator() and yields to the next search. Once every unfinished search
+    is waiting, the queued work runs as one random_playouts_batch call per
+    state class (or serially, if too few for MIN_VECTOR_PLAYOUTS) and one
+    eval_batch call per (heuristic, perspective, side to move), and the
+    searches resume with their share of the results. Time budgets include
+    the time a search spends waiting for the others.
+    """
+
+    def __init__(self):
+        self.serial = MCTSAgent()  # plays pools too small for the engines
+        self.local = threading.local()
+        self.yielded = threading.Event()
+        self.queued = []  # (search, kind, key, payload)
+        self.flushes = 0
+        self.items = 0
+
+    def run(self, jobs):
+        """Results of calling each job, in order; a job that raises returns its exception
+        (any BaseException)."""
+        searches = [LockstepSearch(job) for job in jobs]
+        for search in searches:
+            threading.Thread(target=self.body, args=(search,), daemon=True).start()
+        runnable = searches
+        while runnable:
+            for search in runnable:
+                self.yielded.clear()
+                search.turn.set()
+                self.yielded.wait()
+            queued, self.queued = self.queued, []
+            if queued:
+                self.flush(queued)
+            runnable = [search for search, _, _, _ in queued]
+        return [search.result for search in searches]
+
+    def body(self, search):
+        self.local.search = search
+        search.turn.wait()
+        search.turn.clear()
+        try:
+            search.result = search.job()
+        except BaseException as e:
+            search.result = e
+        finally:
+            # run() waits for this even if the search died
+            self.yielded.set()
+
+    def submit(self, kind, key, payload):
+        search = self.local.search
+        self.queued.append((search, kind, key, payload))
+        self.yielded.set()
+        search.turn.wait()
+        search.turn.clear()
+        if isinstance(search.share, Exception):
+            raise search.share
+        return search.share
+
+    def playouts(self, state, count):
+        """MCTSAgent playout_fn: (winners, plies) of `count` playouts from state."""
+        return self.submit("playouts", None, (state, count))
+
+    def evaluator(self, eval_batch):
+        """An eval_batch(boards, player, to_move) that pools its boards across searches."""
+        def pooled(boards, player, to_move):
+            return self.submit("evaluate", (eval_batch, player, to_move), boards)
+        return pooled
+
+    def flush(self, queued):
+        self.flushes += 1
+        self.items += len(queued)
+        groups = {}
+        for search, kind, key, payload in queued:
+            if kind == "playouts":
+                key = type(payload[0])
+            groups.setdefault((kind, key), []).append((search, kind, key, payload))
+        for (kind, key), items in groups.items():
+            try:
+                if kind == "playouts":
+                    states = [state for _, _, _, (state, _) in items]
+                    counts = [count for _, _, _, (_, count) in items]
+                    if sum(counts) < MIN_VECTOR_PLAYOUTS.get(key, 0):
+                        shares = [self.serial_playouts(state, count)
+                                  for state, count in zip(states, counts)]
+                    else:
+                        winners, plies = random_playouts_batch(states, counts, with_lengths=True)
+                        shares = list(zip(winners, plies))
+                else:
+                    eval_batch, player, to_move = key
+                    sizes = [len(boards) for _, _, _, boards in items]
+                    scores = np.asarray(eval_batch(
+                        np.concatenate([boards for _, _, _, boards in items]), player, to_move))
+                    shares = np.split(scores, np.cumsum(sizes)[:-1])
+            except Exception as e:
+                shares = [e] * len(items)
+            for (search, _, _, _), share in zip(items, shares):
+                search.share = share
+
+    def serial_playouts(self, state, count):
+        winners, plies = [], []
+        for _ in range(count):
+            start = self.serial.stats.rollout_plies
+            winners.append(self.serial.simulate(state) or 0)
+            plies.append(self.serial.stats.rollout_plies - start)
+        return np.array(winners, dtype=np.int8), np.array(plies)
+
+
+class LockstepSearch:
+    __slots__ = ("job", "turn", "result", "share")
+
+    def __init__(self, job):
+        self.job = job
+        self.turn = threading.Event()
+        self.result = None
+        self.share = None
+
+# ---------------------------------------------
+# Server
+# ---------------------------------------------
+
+class MoveServer:
+    """Serves requests from many connections with warm, shared agents.
+
+    Requests wait in one queue. The worker takes everything queued (up to
+    max_batch) as a batch. The batch's select_move searches run in lockstep
+    (see LockstepSearches): their MCTS leaf playouts share
+    random_playouts_batch calls, and the frontiers of Minimax agents that
+    score them with eval_batch share eval_batch calls. Each game_id has its
+    own agent, forked from a warm agent per (game, agent name), so games
+    keep their own MCTS trees and Minimax history while sharing
+    transposition tables; the least recently used games are dropped past
+    max_games. Evaluate requests
+    are scored with one eval_batch call per heuristic, and playouts requests
+    share vectorized engine calls. All search runs on one thread at a time,
+    so the event loop stays free to accept requests and answer stats.
+    """
+
+    def __init__(self, max_batch=256, max_games=1024, latency_window=10000):
+        """
+        max_batch: int - most requests taken off the queue at once
+        max_games: int - games whose agents are kept between requests
+        latency_window: int - recent requests kept for the latency percentiles
+        """
+        self.max_batch = max_batch
+        self.max_games = max_games
+        self.agents = {}  # (game, agent name) -> agent, kept for the server's lifetime
+        self.games = OrderedDict()  # (game_id, game, agent name) -> forked agent, LRU order
+        self.lockstep = LockstepSearches()
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.ops = {}
+        self.queue_times = deque(maxlen=latency_window)
+        self.latencies = deque(maxlen=latency_window)
+
+    def agent(self, game_name, agent_name):
+        key = (game_name, agent_name)
+        if key not in self.agents:
+            self.agents[key] = get_agent(agent_name, game_name)
+        return self.agents[key]
+
+    def game_agent(self, request):
+        """The agent for a select_move request's game, forked on first use."""
+        key = (request.get("game_id"), request["game"], request["agent"])
+        if key[0] is not None and key in self.games:
+            self.games.move_to_end(key)
+            return self.games[key]
+        agent = self.agent(request["game"], request["agent"])
+        if hasattr(agent, "fork"):
+            agent = agent.fork()
+            if type(agent) is MCTSAgent:
+                # Agents without a batch_size pool each leaf's single playout
+                agent.playout_fn = self.lockstep.playouts
+                agent.batch_size = agent.batch_size or 1
+            elif isinstance(agent, MinimaxAgent) and agent.eval_batch is not None:
+                # Only agents that score frontiers with eval_batch anyway; the
+                # others search leaves one by one, which prunes better
+                agent.eval_batch = self.lockstep.evaluator(agent.eval_batch)
+        if key[0] is not None:
+            self.games[key] = agent
+            while len(self.games) > self.max_games:
+                _, evicted = self.games.popitem(last=False)
+                if hasattr(evicted, "close"):
+                    evicted.close()
+        return agent
+
+    def close(self):
+        """Close every agent; warm parallel agents shut down their process pools."""
+        for agent in list(self.games.values()) + list(self.agents.values()):
+            if hasattr(agent, "close"):
+                agent.close()
+        self.games.clear()
+        self.agents.clear()
+        self.executor.shutdown()
+
+    def stats(self):
+        return {
+            "queue_depth": self.queue.qsize(),
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch": self.requests / self.batches if self.batches else 0.0,
+            "errors": self.errors,
+            "ops": self.ops,
+            "agents": sorted(f"{game}/{agent}" for game, agent in self.agents),
+            "games": len(self.games),
+            "leaf_batches": self.lockstep.flushes,
+            "mean_leaf_batch": (self.lockstep.items / self.lockstep.flushes
+                                if self.lockstep.flushes else 0.0),
+            "queue_ms": latency_percentiles(self.queue_times),
+            "latency_ms": latency_percentiles(self.latencies),
+        }
+
+    # --- request handling, on the search thread ---
+
+    def process(self, requests):
+        """Responses for one batch of requests, in order."""
+        responses = [None] * len(requests)
+        evaluations = {}  # (game, heuristic, perspective, player) -> [(index, state)]
+        playouts = []     # (index, state, n)
+        searches = []     # (index, request)
+        for k, request in enumerate(requests):
+            try:
+                op = request.get("op")
+                if op == "select_move":
+                    searches.append((k, request))
+                elif op == "evaluate":
+                    state = make_state(request)
+                    perspective = int(request.get("perspective", state.player))
+                    key = (request["game"], request["heuristic"], perspective, state.player)
+                    evaluations.setdefault(key, []).append((k, state))
+                elif op == "playouts":
+                    playouts.append((k, make_state(request), int(request["n"])))
+                else:
+                    raise ValueError(f"Unknown op: {op}")
+            except Exception as e:
+                responses[k] = {"error": f"{type(e).__name__}: {e}"}
+
+        for key, items in evaluations.items():
+            try:
+                scores = self.evaluate(key, [state for _, state in items])
+                for (k, _), score in zip(items, scores):
+                    responses[k] = {"score": float(score)}
+            except Exception as e:
+                for k, _ in items:
+                    responses[k] = {"error": f"{type(e).__name__}: {e}"}
+
+        if playouts:
+            try:
+                results = random_playouts_batch([state for _, state, _ in playouts],
+                                                [n for _, _, n in playouts])
+                for (k, _, _), winners in zip(playouts, results):
+                    responses[k] = {"wins": {str(w): int((winners == w).sum()) for w in (1, -1, 0)}}
+            except Exception as e:
+                for k, _, _ in playouts:
+                    responses[k] = {"error": f"{type(e).__name__}: {e}"}
+
+        # Searches run in rounds of distinct agents, as one agent cannot run
+        # two searches at once; stateless agents without fork() never yield
+        while searches:
+            wave, later, busy = [], [], set()
+            for k, request in searches:
+                try:
+                    agent = self.game_agent(request)
+                except Exception as e:
+                    responses[k] = {"error": f"{type(e).__name__}: {e}"}
+                    continue
+                if hasattr(agent, "fork") and id(agent) in busy:
+                    later.append((k, request))
+                else:
+                    busy.add(id(agent))
+                    wave.append((k, request, agent))
+            results = self.lockstep.run([
+                lambda request=request, agent=agent: self.select_move(request, agent)
+                for _, request, agent in wave])
+            for (k, _, _), result in zip(wave, results):
+                if isinstance(result, BaseException):
+                    result = {"error": f"{type(result).__name__}: {result}"}
+                responses[k] = result
+            searches = later
+        return responses
+
+    def select_move(self, request, agent):
+        move = agent.select_move(make_state(request))
+        response = {"move": move}
+        if hasattr(agent, "stats"):
+            response["stats"] = agent.stats.summary()
+        return response
+
+    def evaluate(self, key, states):
+        game_name, heuristic_name, perspective, player = key
+        heuristic = HEURISTICS[game_name][heuristic_name]
+        eval_batch = getattr(heuristic, "eval_batch", None)
+        if eval_batch is not None and len(states) > 1:
+            boards = np.stack([np.asarray(state.board) for state in states])
+            return np.asarray(eval_batch(boards, perspective, player), dtype=float).tolist()
+        return [heuristic(state, perspective) for state in states]
+
+    # --- asyncio side ---
+
+    async def worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            started = time.perf_counter()
+            responses = await loop.run_in_executor(
+                self.executor, self.process, [request for request, _, _ in batch])
+            finished = time.perf_counter()
+            self.batches += 1
+            for (request, future, queued), response in zip(batch, responses):
+                self.requests += 1
+                op = str(request.get("op"))
+                self.ops[op] = self.ops.get(op, 0) + 1
+                if "error" in response:
+                    self.errors += 1
+                self.queue_times.append(started - queued)
+                self.latencies.append(finished - queued)
+                response["queue_ms"] = (started - queued) * 1000
+                response["service_ms"] = (finished - started) * 1000
+                if not future.cancelled():
+                    future.set_result(response)
+
+    async def handle(self, reader, writer):
+        lock = asyncio.Lock()  # one response written at a time
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await self.send(writer, lock, {"error": f"Bad JSON: {e}"})
+                    continue
+                if request.get("op") == "stats":
+                    await self.send(writer, lock, dict(self.stats(), id=request.get("id")))
+                    continue
+                task = asyncio.create_task(self.serve(request, writer, lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, request, writer, lock):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((request, future, time.perf_counter()))
+        response = await future
+        response["id"] = request.get("id")
+        await self.send(writer, lock, response)
+
+    async def send(self, writer, lock, response):
+        async with lock:
+            writer.write((json.dumps(response) + "\n").encode())
+            await writer.drain()
+
+# ---------------------------------------------
+# Client
+# ---------------------------------------------
+
+class MoveClient:
+    """Asyncio client; any number of requests may be in flight on one connection."""
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.waiting = {}  # request id -> future
+        self.ids = itertools.count()
+        self.listener = None
+
+    async def connect(self, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+        if unix_path is not None:
+            self.reader, self.writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.waiting.pop(response.get("id"), None)
+            if future is not None and not future.cancelled():
+                future.set_result(response)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError("server closed the connection"))
+
+    async def request(self, op, **fields):
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write((json.dumps(dict(fields, op=op, id=request_id)) + "\n").encode())
+        await self.writer.drain()
+        return await future
+
+    async def select_move(self, game_name, agent_name, state, game_id=None):
+        response = await self.request("select_move", game=game_name, agent=agent_name,
+                                      board=np.asarray(state.board).tolist(), player=state.player,
+                                      game_id=game_id)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return decode_move(response["move"])
+
+    async def close(self):
+        self.writer.close()
+        if self.listener is not None:
+            self.listener.cancel()
+
+
+async def serve(host, port, unix_path=None, max_batch=256, warm=(), max_games=1024):
+    server = MoveServer(max_batch=max_batch, max_games=max_games)
+    for spec in warm:
+        game_name, agent_name = spec.split("/", 1)
+        server.agent(game_name, agent_name)
+    worker = asyncio.create_task(server.worker())
+    if unix_path is not None:
+        listener = await asyncio.start_unix_server(server.handle, path=unix_path)
+        print(f"Serving on {unix_path}", flush=True)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        print(f"Serving on {host}:{port}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        worker.cancel()
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve moves, evaluations and playouts from warm agents over JSON lines.",
+        epilog="Example: python server.py --warm reversi_bitboard/refined:3 checkers/mcts",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", default=None,
+                        help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=256,
+                        help="most queued requests handled as one batch")
+    parser.add_argument("--warm", nargs="*", default=[], metavar="GAME/AGENT",
+                        help="agents to build before accepting requests")
+    parser.add_argument("--max-games", type=int, default=1024,
+                        help="games whose agents (and MCTS trees) are kept between moves")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.max_batch, args.warm,
+                          args.max_games))
+    except KeyboardInterrupt:
+        pass
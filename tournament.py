@@ -0,0 +1,210 @@
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from comparisons import GAMES, game_seed, get_agent, play_game
+
+# ---------------------------------------------
+# Tournament setup
+# ---------------------------------------------
+# Agents are given as comparisons.py agent names, optionally sized with a
+# colon: "refined:4" searches 4 plies, "mcts:200" runs 200 simulations.
+
+DEFAULT_GAMES = ["tictactoe", "checkers_bitboard", "reversi_bitboard"]
+DEFAULT_AGENTS = ["random", "mcts:50", "mcts:200", "simple:2", "refined:2", "refined:3"]
+
+# Rough plies per game and branching factor, only used to order the jobs
+GAME_SHAPE = {"tictactoe": (9, 5), "checkers": (60, 7), "reversi": (60, 8)}
+
+# Virtual draws added between every two agents that met, as in BayesElo, so
+# an agent that won or lost every game still gets a finite rating
+PRIOR_DRAWS = 2.0
+
+
+def supports(agent_name, game_name):
+    """Whether comparisons.get_agent can build this agent for this game."""
+    try:
+        agent = get_agent(agent_name, game_name)
+    except (ValueError, KeyError):
+        return False
+    if hasattr(agent, "close"):
+        agent.close()
+    return True
+
+
+def expected_cost(game_name, agent_name):
+    """Rough relative time one agent spends on one game."""
+    plies, branching = GAME_SHAPE[game_name.split("_")[0]]
+    kind, _, size = agent_name.partition(":")
+    if kind.startswith("mcts"):
+        # num_simulations playouts per legal root move, each about half a game long
+        simulations = int(size) if size else (1000 if kind == "mcts_batch" else 100)
+        per_move = simulations * branching * plies / 2
+    elif kind == "random":
+        per_move = 1
+    else:
+        per_move = branching ** (int(size) if size else 3)
+    return per_move * plies / 2
+
+
+def schedule(games, agents, rounds, seed):
+    """Every pairing of every game, `rounds` times with each colour, longest first.
+
+    Both colours of a round share a seed, so they start from the same
+    random opening.
+    """
+    jobs = []
+    for game_name in games:
+        entrants = [a for a in agents if supports(a, game_name)]
+        for a, b in combinations(entrants, 2):
+            for r in range(rounds):
+                s = game_seed(seed, f"{game_name}/{a}/{b}/{r}")
+                cost = expected_cost(game_name, a) + expected_cost(game_name, b)
+                jobs.append((cost, game_name, a, b, s))
+                jobs.append((cost, game_name, b, a, s))
+    # A pool takes tasks in submission order; starting the longest first
+    # keeps every worker busy until the end
+    jobs.sort(key=lambda job: -job[0])
+    return [job[1:] for job in jobs]
+
+# ---------------------------------------------
+# Ratings
+# ---------------------------------------------
+
+def mm_ratings(agents, points, games, prior_draws=PRIOR_DRAWS, iterations=10000, tol=1e-10):
+    """Bradley-Terry Elo ratings fitted by minorization-maximization.
+
+    points[a][b]: points a scored against b (win 1, draw 1/2)
+    games[a][b]: games a and b played
+    Ratings are shifted to average 0.
+    """
+    wins = {a: 0.0 for a in agents}
+    played = {a: {} for a in agents}
+    for a in agents:
+        for b in agents:
+            n = games[a].get(b, 0)
+            if a == b or n == 0:
+                continue
+            wins[a] += points[a][b] + prior_draws / 2
+            played[a][b] = n + prior_draws
+    gamma = {a: 1.0 for a in agents}
+    for _ in range(iterations):
+        new = {}
+        for a in agents:
+            denominator = sum(n / (gamma[a] + gamma[b]) for b, n in played[a].items())
+            new[a] = wins[a] / denominator if denominator else gamma[a]
+        # Fix the scale: geometric mean 1
+        mean_log = sum(math.log(g) for g in new.values()) / len(new)
+        new = {a: g / math.exp(mean_log) for a, g in new.items()}
+        change = max(abs(math.log(new[a] / gamma[a])) for a in agents)
+        gamma = new
+        if change < tol:
+            break
+    return {a: 400 * math.log10(g) for a, g in gamma.items()}
+
+
+def print_game_report(game_name, agents, points, games):
+    entrants = [a for a in agents if any(games[a].values())]
+    if not entrants:
+        return
+    ratings = mm_ratings(entrants, points, games)
+    ranked = sorted(entrants, key=lambda a: -ratings[a])
+    width = max(len(a) for a in ranked) + 2
+
+    print(f"\n== {game_name} ==")
+    print(f"{'Rank':<5}{'Agent':<{width}}{'Elo':>7}{'Score':>9}{'Games':>7}")
+    for rank, a in enumerate(ranked, 1):
+        total = sum(games[a].values())
+        score = sum(points[a].values()) / total
+        print(f"{rank:<5}{a:<{width}}{ratings[a]:>+7.0f}{score:>9.1%}{total:>7}")
+
+    print("\nCrosstable (points of the row agent against the column agent):")
+    cell = max(width, 9)
+    print(" " * width + "".join(f"{a:>{cell}}" for a in ranked))
+    for a in ranked:
+        row = []
+        for b in ranked:
+            if a == b or not games[a].get(b):
+                row.append(f"{'-':>{cell}}")
+            else:
+                row.append(f"{points[a][b]:g}/{games[a][b]}".rjust(cell))
+        print(f"{a:<{width}}" + "".join(row))
+
+# ---------------------------------------------
+# Tournament
+# ---------------------------------------------
+
+def run_tournament(games, agents, rounds=1, workers=None, seed=None):
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    workers = workers or os.cpu_count() or 1
+    jobs = schedule(games, agents, rounds, seed)
+    print(f"Seed: {seed}")
+    print(f"{len(jobs)} games on {workers} workers")
+
+    points = {g: {a: {} for a in agents} for g in games}
+    played = {g: {a: {} for a in agents} for g in games}
+    game_time = 0.0
+    start = time.perf_counter()
+
+    def record(job, result):
+        nonlocal game_time
+        game_name, first, second, _ = job
+        game_time += result["time"]
+        score = {1: 1.0, -1: 0.0, 0: 0.5}[result["winner"]]
+        for a, b, s in ((first, second, score), (second, first, 1 - score)):
+            points[game_name][a][b] = points[game_name][a].get(b, 0) + s
+            played[game_name][a][b] = played[game_name][a].get(b, 0) + 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(play_game, *job, {}): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            result = future.result()
+            record(job, result)
+            winner = {1: job[1], -1: job[2], 0: "draw"}[result["winner"]]
+            print(f"[{done}/{len(jobs)}] {job[0]}: {job[1]} vs {job[2]} -> {winner} "
+                  f"({result['plies']} moves, {result['time']:.1f}s)")
+
+    elapsed = time.perf_counter() - start
+    print(f"\nPlayed {len(jobs)} games in {elapsed:.1f}s "
+          f"({game_time:.1f}s of game time, {game_time / max(elapsed, 1e-9) / workers:.0%} "
+          f"of {workers} workers busy)")
+    for game_name in games:
+        print_game_report(game_name, agents, points[game_name], played[game_name])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Round-robin tournament between agents, with Elo ratings per game.",
+        epilog="Example: python tournament.py --agents random mcts:100 refined:2 refined:4 "
+               "--games reversi_bitboard --rounds 4",
+    )
+    parser.add_argument("--games", nargs="+", type=str.lower, default=DEFAULT_GAMES,
+                        help=f"games to play (default: {' '.join(DEFAULT_GAMES)})")
+    parser.add_argument("--agents", nargs="+", type=str.lower, default=DEFAULT_AGENTS,
+                        help="agent names as in comparisons.py; append :N for the Minimax "
+                             "depth or MCTS simulations (default: "
+                             f"{' '.join(DEFAULT_AGENTS)})")
+    parser.add_argument("--rounds", type=int, default=2,
+                        help="games per pairing and colour (default 2)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="tournament seed; each game's seed derives from it")
+    args = parser.parse_args()
+
+    for game in args.games:
+        if game not in GAMES:
+            print(f"Unsupported game: {game}")
+            sys.exit(1)
+    if len(set(args.agents)) != len(args.agents):
+        print("Agents must be distinct")
+        sys.exit(1)
+
+    run_tournament(args.games, args.agents, rounds=args.rounds, workers=args.workers,
+                   seed=args.seed)